@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Arsip absensi semester + rekap per mahasiswa
+
+Setiap sesi yang sudah final diarsipkan ke DATA_DIR/arsip.db. Saat
+arsip, rekap per mahasiswa (kunci: NPM, atau nama jika tanpa NPM) per
+semester + mata kuliah langsung diperbarui secara inkremental, jadi
+rekap semester dan PDF-nya tidak perlu membaca ulang semua sesi.
+Mengarsipkan ulang sesi yang sama mengganti kontribusi lamanya.
+
+    python archive.py arsip --sesi metodologi-penelitian_2025-05-12
+    python archive.py rekap --semester "2024/2025 Genap" --matkul "Metodologi Penelitian" -o rekap.pdf
+"""
+
+import argparse
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from models import as_mahasiswa
+from storage import DATA_DIR, get_store, has_npm, normalize_nama
+
+ARCHIVE_FILE = DATA_DIR / 'arsip.db'
+
+# Status -> kolom rekap; urutan = prioritas jika satu mahasiswa tercatat dua kali di satu sesi
+STATUS_COLUMNS = {'Hadir': 'hadir', 'Izin': 'izin', 'Sakit': 'sakit', 'Tidak Hadir': 'tidak_hadir'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS arsip_sesi (
+    sesi TEXT PRIMARY KEY,
+    semester TEXT NOT NULL,
+    matkul_key TEXT NOT NULL,
+    matkul TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    dosen TEXT,
+    jumlah INTEGER NOT NULL,
+    diarsipkan TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS arsip_kehadiran (
+    sesi TEXT NOT NULL,
+    kunci TEXT NOT NULL,
+    npm TEXT NOT NULL,
+    nama TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (sesi, kunci)
+);
+CREATE TABLE IF NOT EXISTS rekap_matkul (
+    semester TEXT NOT NULL,
+    matkul_key TEXT NOT NULL,
+    matkul TEXT NOT NULL,
+    pertemuan INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (semester, matkul_key)
+);
+CREATE TABLE IF NOT EXISTS rekap (
+    semester TEXT NOT NULL,
+    matkul_key TEXT NOT NULL,
+    kunci TEXT NOT NULL,
+    npm TEXT NOT NULL,
+    nama TEXT NOT NULL,
+    hadir INTEGER NOT NULL DEFAULT 0,
+    izin INTEGER NOT NULL DEFAULT 0,
+    sakit INTEGER NOT NULL DEFAULT 0,
+    tidak_hadir INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (semester, matkul_key, kunci)
+);
+"""
+
+
+def semester_of(tanggal: date) -> str:
+    """Semester akademik: Agustus-Januari ganjil, Februari-Juli genap"""
+    if tanggal.month >= 8:
+        return f'{tanggal.year}/{tanggal.year + 1} Ganjil'
+    if tanggal.month == 1:
+        return f'{tanggal.year - 1}/{tanggal.year} Ganjil'
+    return f'{tanggal.year - 1}/{tanggal.year} Genap'
+
+
+def student_key(nama: str, npm: str) -> str:
+    """Identitas mahasiswa di rekap: NPM jika ada, selain itu nama ternormalisasi"""
+    return f'npm:{str(npm).strip()}' if has_npm(npm) else f'nama:{normalize_nama(nama)}'
+
+
+def _session_date(sesi: Optional[str], data: Dict) -> date:
+    """Tanggal sesi: dari ID sesi (..._YYYY-MM-DD), field tanggal laporan, atau hari ini"""
+    if sesi:
+        try:
+            return date.fromisoformat(sesi.rsplit('_', 1)[1])
+        except (IndexError, ValueError):
+            pass
+    try:
+        return datetime.strptime(str(data.get('tanggal', '')), '%d %B %Y').date()
+    except ValueError:
+        return date.today()
+
+
+class Archive:
+    def __init__(self, path=None):
+        self.path = path or ARCHIVE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def archive(self, data: Dict, sesi: Optional[str] = None, semester: Optional[str] = None) -> Dict:
+        """Arsipkan satu sesi (hasil store.load()) dan perbarui rekap. Return info sesi."""
+        matkul = ' '.join(str(data.get('matkul') or '').split())
+        if not matkul:
+            raise ValueError("Mata kuliah harus diisi sebelum diarsipkan")
+        tanggal = _session_date(sesi, data)
+        semester = semester or semester_of(tanggal)
+        matkul_key = normalize_nama(matkul)
+        sesi = sesi or f'default_{tanggal.isoformat()}'
+
+        # Satu baris per mahasiswa; jika tercatat dua kali, status terbaik yang dipakai
+        priority = list(STATUS_COLUMNS)
+        rows = {}
+        for mhs in map(as_mahasiswa, data.get('mahasiswa', [])):
+            if mhs.status not in STATUS_COLUMNS:
+                continue
+            key = student_key(mhs.nama, mhs.npm)
+            old = rows.get(key)
+            if old is None or priority.index(mhs.status) < priority.index(old[2]):
+                rows[key] = (mhs.npm, ' '.join(mhs.nama.split()), mhs.status)
+
+        with self._write() as conn:
+            self._remove(conn, sesi)
+            conn.execute(
+                'INSERT INTO arsip_sesi (sesi, semester, matkul_key, matkul, tanggal, dosen, jumlah, diarsipkan) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (sesi, semester, matkul_key, matkul, tanggal.isoformat(), data.get('dosen') or '',
+                 len(rows), datetime.now().isoformat(timespec='seconds'))
+            )
+            conn.executemany(
+                'INSERT INTO arsip_kehadiran (sesi, kunci, npm, nama, status) VALUES (?, ?, ?, ?, ?)',
+                [(sesi, key, npm, nama, status) for key, (npm, nama, status) in rows.items()]
+            )
+            conn.execute(
+                'INSERT INTO rekap_matkul (semester, matkul_key, matkul, pertemuan) VALUES (?, ?, ?, 1) '
+                'ON CONFLICT(semester, matkul_key) DO UPDATE SET pertemuan = pertemuan + 1, matkul = excluded.matkul',
+                (semester, matkul_key, matkul)
+            )
+            for status, column in STATUS_COLUMNS.items():
+                conn.executemany(
+                    f'INSERT INTO rekap (semester, matkul_key, kunci, npm, nama, {column}) VALUES (?, ?, ?, ?, ?, 1) '
+                    f'ON CONFLICT(semester, matkul_key, kunci) DO UPDATE SET {column} = {column} + 1, '
+                    f'npm = excluded.npm, nama = excluded.nama',
+                    [(semester, matkul_key, key, npm, nama)
+                     for key, (npm, nama, row_status) in rows.items() if row_status == status]
+                )
+        return {'sesi': sesi, 'semester': semester, 'matkul': matkul,
+                'tanggal': tanggal.isoformat(), 'jumlah': len(rows)}
+
+    def _remove(self, conn, sesi: str):
+        """Kurangi kontribusi sesi yang pernah diarsipkan dari rekap"""
+        old = conn.execute('SELECT semester, matkul_key FROM arsip_sesi WHERE sesi = ?', (sesi,)).fetchone()
+        if old is None:
+            return
+        semester, matkul_key = old['semester'], old['matkul_key']
+        for status, column in STATUS_COLUMNS.items():
+            conn.execute(
+                f'UPDATE rekap SET {column} = {column} - 1 WHERE semester = ? AND matkul_key = ? AND kunci IN '
+                f'(SELECT kunci FROM arsip_kehadiran WHERE sesi = ? AND status = ?)',
+                (semester, matkul_key, sesi, status)
+            )
+        conn.execute('DELETE FROM rekap WHERE semester = ? AND matkul_key = ? '
+                     'AND hadir + izin + sakit + tidak_hadir = 0', (semester, matkul_key))
+        conn.execute('UPDATE rekap_matkul SET pertemuan = pertemuan - 1 WHERE semester = ? AND matkul_key = ?',
+                     (semester, matkul_key))
+        conn.execute('DELETE FROM arsip_kehadiran WHERE sesi = ?', (sesi,))
+        conn.execute('DELETE FROM arsip_sesi WHERE sesi = ?', (sesi,))
+
+    def unarchive(self, sesi: str):
+        """Hapus sesi dari arsip (rekap ikut dikoreksi)"""
+        with self._write() as conn:
+            self._remove(conn, sesi)
+
+    def courses(self) -> List[Dict]:
+        """Semua (semester, matkul) yang punya arsip, terbaru dulu"""
+        return [dict(row) for row in self._conn().execute(
+            'SELECT semester, matkul, pertemuan FROM rekap_matkul WHERE pertemuan > 0 '
+            'ORDER BY semester DESC, matkul')]
+
+    def sessions(self, semester: str, matkul: str) -> List[Dict]:
+        return [dict(row) for row in self._conn().execute(
+            'SELECT sesi, tanggal, jumlah, diarsipkan FROM arsip_sesi '
+            'WHERE semester = ? AND matkul_key = ? ORDER BY tanggal',
+            (semester, normalize_nama(matkul)))]
+
+    def recap(self, semester: str, matkul: str) -> Dict:
+        """Rekap semester satu mata kuliah dari tabel rollup (tanpa membaca sesi).
+
+        alpa = pertemuan yang tidak tercatat sama sekali + 'Tidak Hadir'.
+        """
+        conn = self._conn()
+        matkul_key = normalize_nama(matkul)
+        course = conn.execute('SELECT matkul, pertemuan FROM rekap_matkul WHERE semester = ? AND matkul_key = ?',
+                              (semester, matkul_key)).fetchone()
+        pertemuan = course['pertemuan'] if course else 0
+        rows = []
+        for row in conn.execute('SELECT npm, nama, hadir, izin, sakit, tidak_hadir FROM rekap '
+                                'WHERE semester = ? AND matkul_key = ?', (semester, matkul_key)):
+            tercatat = row['hadir'] + row['izin'] + row['sakit']
+            rows.append({
+                'npm': row['npm'],
+                'nama': row['nama'],
+                'hadir': row['hadir'],
+                'izin': row['izin'],
+                'sakit': row['sakit'],
+                'alpa': max(0, pertemuan - tercatat),
+                'persen': 100.0 * row['hadir'] / pertemuan if pertemuan else 0.0,
+            })
+        rows.sort(key=lambda r: (normalize_nama(r['nama']), r['npm']))
+        return {
+            'semester': semester,
+            'matkul': course['matkul'] if course else matkul,
+            'pertemuan': pertemuan,
+            'mahasiswa': rows,
+        }
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Archive:
+    """Arsip bersama untuk proses ini"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = Archive()
+        return _archive
+
+
+def archive_session(sesi: Optional[str] = None, semester: Optional[str] = None) -> Dict:
+    """Arsipkan isi store sesi (default: store tanpa sesi)"""
+    return get_archive().archive(get_store(session=sesi).load(), sesi=sesi, semester=semester)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arsip absensi semester & rekap per mahasiswa")
+    sub = parser.add_subparsers(dest='action', required=True)
+    arsip = sub.add_parser('arsip', help="Arsipkan satu sesi")
+    arsip.add_argument('--sesi', default=None, help="ID sesi (default: store tanpa sesi)")
+    arsip.add_argument('--semester', default=None, help="Default: dihitung dari tanggal sesi")
+    rekap = sub.add_parser('rekap', help="Tampilkan rekap semester")
+    rekap.add_argument('--semester', required=True)
+    rekap.add_argument('--matkul', required=True)
+    rekap.add_argument('-o', '--output', help="Simpan rekap sebagai PDF")
+    sub.add_parser('daftar', help="Daftar semester & mata kuliah yang diarsipkan")
+    args = parser.parse_args()
+
+    if args.action == 'arsip':
+        info = archive_session(args.sesi, args.semester)
+        print(f"✅ {info['sesi']} diarsipkan ({info['semester']}, {info['jumlah']} mahasiswa)")
+    elif args.action == 'daftar':
+        for course in get_archive().courses():
+            print(f"{course['semester']:<18} {course['matkul']:<40} {course['pertemuan']:>3} pertemuan")
+    else:
+        recap = get_archive().recap(args.semester, args.matkul)
+        print(f"📊 {recap['matkul']} - {recap['semester']} ({recap['pertemuan']} pertemuan)")
+        for i, row in enumerate(recap['mahasiswa'], 1):
+            print(f"{i:>3}. {row['nama']:<35} {row['npm']:<14} H{row['hadir']:>3} I{row['izin']:>3} "
+                  f"S{row['sakit']:>3} A{row['alpa']:>3} {row['persen']:5.1f}%")
+        if args.output:
+            from utils_simple import generate_rekap_pdf
+            with open(args.output, 'wb') as f:
+                f.write(generate_rekap_pdf(recap))
+            print(f"✅ PDF: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Generate banyak laporan PDF sekaligus (mis. akhir semester)
+
+Input: direktori berisi file JSON sesi (format laporan_data.json).
+Foto untuk sesi `pertemuan_01.json` diambil dari folder `pertemuan_01/`
+di direktori foto (default: direktori input yang sama).
+
+    python batch_laporan.py data_semester/ -o laporan_output/
+
+Output yang isinya tidak berubah sejak run sebelumnya dilewati
+(dicek lewat hash data + foto yang disimpan di <nama>.pdf.key).
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import utils_simple
+from models import Laporan, loads
+from utils_simple import (
+    available_cpus,
+    generate_simple_pdf,
+    report_cache_key
+)
+
+PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def find_photos(photo_dir: Path, stem: str):
+    """Foto untuk satu sesi (max 8, urut nama file)"""
+    folder = photo_dir / stem
+    if not folder.is_dir():
+        return []
+    photos = sorted(p for p in folder.iterdir() if p.suffix.lower() in PHOTO_EXTENSIONS)
+    return photos[:8]
+
+
+def _init_worker():
+    # Paralelisme sudah di level proses, foto cukup diproses serial
+    utils_simple.PHOTO_WORKERS = 1
+
+
+def render_one(json_path: str, photo_dir: str, output_dir: str, force: bool = False):
+    """Render satu sesi. Return (nama, status, detik, ukuran_bytes, pesan)"""
+    start = time.perf_counter()
+    json_path = Path(json_path)
+    out_path = Path(output_dir) / f'{json_path.stem}.pdf'
+    key_path = out_path.with_name(out_path.name + '.key')
+
+    try:
+        with open(json_path, 'rb') as f:
+            data = Laporan.from_dict(loads(f.read()))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return json_path.name, 'error', time.perf_counter() - start, 0, str(e)
+
+    is_valid, msg = data.validate()
+    if not is_valid:
+        return json_path.name, 'error', time.perf_counter() - start, 0, msg
+
+    photos = [str(p) for p in find_photos(Path(photo_dir), json_path.stem)]
+    key = report_cache_key(data, photos)
+
+    if not force and out_path.exists() and key_path.exists() and key_path.read_text().strip() == key:
+        return json_path.name, 'skip', time.perf_counter() - start, out_path.stat().st_size, ''
+
+    tmp = out_path.with_name(f'.{out_path.name}.{os.getpid()}.tmp')
+    try:
+        pdf_data = generate_simple_pdf(data, photos, in_memory=True)
+
+        tmp.write_bytes(pdf_data)
+        os.replace(tmp, out_path)
+        key_path.write_text(key)
+    except Exception as e:
+        # Satu laporan gagal tidak menghentikan batch
+        tmp.unlink(missing_ok=True)
+        return json_path.name, 'error', time.perf_counter() - start, 0, f'{type(e).__name__}: {e}'
+
+    return json_path.name, 'ok', time.perf_counter() - start, len(pdf_data), f'{len(photos)} foto'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate laporan PDF untuk semua sesi dalam satu direktori")
+    parser.add_argument('input_dir', help="Direktori berisi file JSON sesi")
+    parser.add_argument('-o', '--output-dir', default='laporan_output', help="Direktori output PDF")
+    parser.add_argument('-p', '--photo-dir', default=None, help="Direktori folder foto per sesi (default: input_dir)")
+    parser.add_argument('-j', '--jobs', type=int, default=available_cpus(), help="Jumlah proses paralel")
+    parser.add_argument('-f', '--force', action='store_true', help="Render ulang walaupun tidak berubah")
+    args = parser.parse_args()
+
+    input_dir = Path(args.input_dir)
+    photo_dir = Path(args.photo_dir) if args.photo_dir else input_dir
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    json_files = sorted(input_dir.glob('*.json'))
+    if not json_files:
+        print(f"⚠️ Tidak ada file JSON di {input_dir}")
+        return 1
+
+    print(f"🚀 {len(json_files)} sesi, {args.jobs} proses")
+    start = time.perf_counter()
+    counts = {'ok': 0, 'skip': 0, 'error': 0}
+    rendered_bytes = 0
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs), initializer=_init_worker) as pool:
+        futures = {pool.submit(render_one, str(p), str(photo_dir), str(output_dir), args.force): p
+                   for p in json_files}
+        for future in as_completed(futures):
+            try:
+                name, status, seconds, size, msg = future.result()
+            except Exception as e:
+                # Mis. proses worker mati (BrokenProcessPool)
+                name, status, seconds, size, msg = futures[future].name, 'error', 0, 0, f'{type(e).__name__}: {e}'
+            counts[status] += 1
+            icon = {'ok': '✅', 'skip': '⏭️', 'error': '❌'}[status]
+            if status == 'ok':
+                rendered_bytes += size
+            print(f"{icon} {name:<40} {seconds * 1000:8.0f} ms {size / 1024:8.1f} KB  {msg}")
+
+    total = time.perf_counter() - start
+    print()
+    print(f"📊 {counts['ok']} dibuat, {counts['skip']} dilewati, {counts['error']} gagal "
+          f"dalam {total:.2f} s")
+    if counts['ok']:
+        print(f"⚡ Throughput: {counts['ok'] / total:.2f} PDF/s, {rendered_bytes / 1024 / 1024 / total:.2f} MB/s")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark model baris absensi: dict + json vs Mahasiswa (__slots__) + dumps/loads
+
+Mengukur waktu baca sesi besar dan memori per baris, lewat store yang
+sebenarnya: JournalStore._refresh() (parse snapshot + index, baris tetap
+dict) dibandingkan cara lama json.loads + index, lalu JournalStore.load()
+yang membuat Mahasiswa per baris, dan load SQLite. _refresh() tidak boleh
+lebih lambat dari cara lama (dicek dengan assert).
+
+    python benchmarks/bench_models.py
+    python benchmarks/bench_models.py --rows 20000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import dumps, orjson  # noqa: E402
+from storage import JournalStore, MahasiswaIndex, SQLiteStore  # noqa: E402
+
+# Toleransi noise timer untuk assert (tanpa orjson kedua jalur sama-sama json)
+PARSE_TOLERANCE = 1.10
+
+
+def synthetic_rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = ['Muhammad', 'Siti', 'Nurul', 'Rahmawati', 'Pratama', 'Hidayatullah', 'Wulandari', 'Ramadhan']
+    return [
+        {
+            'nama': ' '.join(rng.choice(words) for _ in range(rng.randint(2, 4))),
+            'npm': f"{2019 + i % 5}{i:08d}",
+            'status': rng.choice(['Hadir', 'Hadir', 'Tidak Hadir', 'Izin', 'Sakit']),
+            'waktu_absen': f'10:{i % 60:02d}:00',
+        }
+        for i in range(n)
+    ]
+
+
+def measure(fn, repeat: int = 5):
+    """(waktu terbaik dalam detik, memori hasil dalam bytes)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse + memori baris absensi")
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    snapshot = json.dumps({'matkul': 'Benchmark', 'mahasiswa': rows}, indent=2).encode('utf-8')
+
+    def old():
+        # _refresh lama: json.loads snapshot + index
+        mahasiswa = json.loads(snapshot)['mahasiswa']
+        return mahasiswa, MahasiswaIndex(mahasiswa)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JournalStore(Path(tmp) / 'laporan_data.json')
+        store.path.write_bytes(snapshot)
+
+        def refresh():
+            # Paksa baca ulang snapshot, seperti setelah compaction proses lain
+            store._snapshot_id = None
+            store._refresh()
+            return store._state['mahasiswa'], store._index
+
+        old_time, old_mem = measure(old)
+        new_time, new_mem = measure(refresh)
+        load_time, load_mem = measure(lambda: store.load()['mahasiswa'])
+        parsed = store.load()['mahasiswa']
+        store.close()
+
+    print(f"rows={args.rows} snapshot={len(snapshot) / 1024:.0f}KB serializer={'orjson' if orjson else 'json'}")
+    print(f"{'':<22} {'waktu':>10} {'byte/baris':>12}")
+    print(f"{'json.loads + index':<22} {old_time * 1000:8.1f}ms {old_mem / args.rows:12.0f}")
+    print(f"{'JournalStore._refresh':<22} {new_time * 1000:8.1f}ms {new_mem / args.rows:12.0f}")
+    print(f"{'JournalStore.load()':<22} {load_time * 1000:8.1f}ms {load_mem / args.rows:12.0f}")
+    assert new_time <= old_time * PARSE_TOLERANCE, \
+        f"_refresh lebih lambat: {new_time * 1000:.1f}ms vs {old_time * 1000:.1f}ms"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(Path(tmp) / 'laporan.db')
+        store.import_data({'matkul': 'Benchmark', 'mahasiswa': rows})
+        conn = store._conn()
+
+        def sqlite_dict():
+            # Cara lama: Row -> dict, field opsional hanya jika terisi
+            result = []
+            for row in conn.execute('SELECT * FROM kehadiran ORDER BY id'):
+                mhs = {'nama': row['nama'], 'npm': row['npm'], 'status': row['status']}
+                if row['waktu_absen']:
+                    mhs['waktu_absen'] = row['waktu_absen']
+                if row['keterangan']:
+                    mhs['keterangan'] = row['keterangan']
+                result.append(mhs)
+            return result
+
+        dict_time, dict_mem = measure(sqlite_dict)
+        load_time, load_mem = measure(lambda: store.load()['mahasiswa'])
+        store.close()
+    print(f"{'sqlite -> dict':<22} {dict_time * 1000:8.1f}ms {dict_mem / args.rows:12.0f}")
+    print(f"{'sqlite -> Mahasiswa':<22} {load_time * 1000:8.1f}ms {load_mem / args.rows:12.0f}")
+
+    encoded = [m.to_dict() for m in parsed]
+    json_time, _ = measure(lambda: json.dumps(encoded, ensure_ascii=False))
+    dumps_time, _ = measure(lambda: dumps(encoded))
+    print(f"serialize: json {json_time * 1000:.1f}ms, dumps {dumps_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
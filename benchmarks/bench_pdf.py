@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate_simple_pdf
+
+Menjalankan generate_simple_pdf untuk matriks input sintetis (jumlah
+mahasiswa, catatan, foto + resolusi, tanda tangan) dan mencatat waktu,
+peak RSS, dan ukuran output ke file JSON. Setiap kasus dijalankan di
+proses baru supaya peak RSS tidak tercampur antar kasus.
+
+Kasus RSS (foto besar, banyak worker) selalu dijalankan di akhir dan harus
+tetap di bawah utils_simple.PHOTO_RSS_CEILING_MB; exit code 1 jika tidak.
+
+    python benchmarks/bench_pdf.py                 # matriks penuh
+    python benchmarks/bench_pdf.py --quick         # matriks kecil
+    python benchmarks/bench_pdf.py -o new.json --compare old.json
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+ROSTER_SIZES = [10, 100, 500, 2000]
+NOTE_COUNTS = [0, 10, 50]
+PHOTO_COUNTS = [0, 4, 8]
+PHOTO_RESOLUTIONS = [(1280, 960), (4000, 3000)]
+SIGNATURE = [False, True]
+
+QUICK = {
+    'roster': [10, 500],
+    'notes': [0, 10],
+    'photos': [0, 8],
+    'resolutions': [(1280, 960)],
+    'signature': [True],
+}
+
+# Foto besar untuk cek PHOTO_RSS_CEILING_MB: 8 JPEG 48 MP, dan 8 PNG ~23 MP
+# (di-decode penuh) dengan 4 worker foto
+RSS_CASES = [
+    {'roster': 100, 'notes': 10, 'photos': 8, 'resolution': [8000, 6000], 'signature': True,
+     'format': 'JPEG', 'workers': 4},
+    {'roster': 100, 'notes': 10, 'photos': 8, 'resolution': [5600, 4100], 'signature': True,
+     'format': 'PNG', 'workers': 4},
+]
+
+STATUSES = ['Hadir', 'Hadir', 'Hadir', 'Tidak Hadir', 'Izin', 'Sakit']
+
+
+def synthetic_data(roster: int, notes: int, signature: bool, seed: int = 42) -> dict:
+    """Data laporan sintetis yang deterministik"""
+    rng = random.Random(seed)
+    first = ['Budi', 'Siti', 'Andi', 'Dewi', 'Rizky', 'Putri', 'Agus', 'Nur', 'Fajar', 'Indah']
+    last = ['Santoso', 'Rahmawati', 'Pratama', 'Lestari', 'Hidayat', 'Saputra', 'Wulandari', 'Nugroho']
+    data = {
+        'matkul': 'Metodologi Penelitian',
+        'sks': '2 SKS / Semester 5',
+        'dosen': 'Dra. Asmawati M.Pd',
+        'prodi': 'Pendidikan Bahasa Indonesia',
+        'jam': '10:00 - 12:00',
+        'tanggal': '12 Mei 2025',
+        'mahasiswa': [
+            {
+                'nama': f"{rng.choice(first)} {rng.choice(last)} {i}",
+                'npm': f"2021{i:06d}",
+                'status': rng.choice(STATUSES),
+                'waktu_absen': '10:05:00',
+            }
+            for i in range(roster)
+        ],
+        'catatan': [
+            f"Catatan ke-{i}: " + ' '.join(rng.choice(last).lower() for _ in range(rng.randint(5, 40)))
+            for i in range(notes)
+        ],
+        'ttd_tempat': 'Lubuk Alung',
+        'ttd_tanggal': '12 Mei 2025',
+        'ttd_nama': 'Dra. Asmawati M.Pd',
+        'link_presentasi': 'https://example.com/presentasi',
+        'link_rekaman': 'https://example.com/rekaman',
+        'signature': synthetic_signature() if signature else None,
+    }
+    return data
+
+
+def synthetic_signature() -> str:
+    from PIL import Image, ImageDraw
+
+    img = Image.new('RGBA', (600, 250), (255, 255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.line([(50, 180), (150, 60), (250, 200), (350, 80), (450, 190), (550, 100)], fill=(0, 0, 0, 255), width=3)
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def synthetic_photo(size, seed: int, fmt: str = 'JPEG') -> bytes:
+    """Foto sintetis. JPEG: gradient + noise supaya ukuran mirip foto asli;
+    PNG: gradient saja (encode cepat, decode tetap penuh)"""
+    from PIL import Image
+
+    width, height = size
+    gradient = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    if fmt == 'JPEG':
+        noise = Image.effect_noise((width, height), 64 + seed % 32).convert('RGB')
+        img = Image.blend(noise, gradient, 0.5)
+    else:
+        img = gradient
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, **({'quality': 90} if fmt == 'JPEG' else {'compress_level': 1}))
+    return buffer.getvalue()
+
+
+def write_photos(case: dict, directory: Path) -> list:
+    """Foto kasus sebagai file (dibuat di proses induk, tidak ikut peak RSS kasus)"""
+    paths = []
+    for i in range(case['photos']):
+        path = directory / f"foto_{i}.{case['format'].lower()}"
+        path.write_bytes(synthetic_photo(tuple(case['resolution']), i, case['format']))
+        paths.append(str(path))
+    return paths
+
+
+def peak_rss_kb() -> int:
+    """Peak RSS proses ini (KB). VmHWM milik address space sendiri; ru_maxrss
+    ikut membawa RSS proses induk saat fork sebelum exec."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_case(case: dict) -> dict:
+    """Dijalankan di proses baru: generate PDF dan ukur"""
+    # Foto sintetis sama di semua kasus - ukur pemrosesan foto tanpa cache
+    os.environ.setdefault('LAPORAN_PHOTO_CACHE_MB', '0')
+    if case.get('workers'):
+        os.environ['LAPORAN_PHOTO_WORKERS'] = str(case['workers'])
+    from utils_simple import generate_simple_pdf
+
+    data = synthetic_data(case['roster'], case['notes'], case['signature'])
+    photos = case.get('photo_paths') or [synthetic_photo(tuple(case['resolution']), i)
+                                         for i in range(case['photos'])]
+
+    rss_before = peak_rss_kb()
+    start = time.perf_counter()
+    pdf_data = generate_simple_pdf(data, photos, in_memory=True)
+    wall = time.perf_counter() - start
+    rss_peak = peak_rss_kb()
+
+    return {
+        **{k: v for k, v in case.items() if k != 'photo_paths'},
+        'wall_s': round(wall, 4),
+        'peak_rss_mb': round(rss_peak / 1024, 1),
+        'rss_delta_mb': round((rss_peak - rss_before) / 1024, 1),
+        'output_bytes': len(pdf_data),
+    }
+
+
+def build_matrix(quick: bool):
+    if quick:
+        dims = QUICK
+    else:
+        dims = {
+            'roster': ROSTER_SIZES,
+            'notes': NOTE_COUNTS,
+            'photos': PHOTO_COUNTS,
+            'resolutions': PHOTO_RESOLUTIONS,
+            'signature': SIGNATURE,
+        }
+    cases = []
+    for roster, notes, photos, resolution, signature in itertools.product(
+            dims['roster'], dims['notes'], dims['photos'], dims['resolutions'], dims['signature']):
+        if photos == 0 and resolution != dims['resolutions'][0]:
+            continue  # Resolusi tidak relevan tanpa foto
+        cases.append({
+            'roster': roster,
+            'notes': notes,
+            'photos': photos,
+            'resolution': list(resolution),
+            'signature': signature,
+        })
+    return cases
+
+
+def case_id(case: dict) -> str:
+    res = 'x'.join(map(str, case['resolution']))
+    cid = f"r{case['roster']}-n{case['notes']}-p{case['photos']}@{res}-s{int(case['signature'])}"
+    if 'format' in case:
+        cid += f"-{case['format'].lower()}-w{case['workers']}"
+    return cid
+
+
+def run_isolated(case: dict, ctx) -> dict:
+    # Proses baru per run supaya peak RSS terukur per kasus
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_case, case).result()
+
+
+def check_rss(ctx) -> bool:
+    """Jalankan RSS_CASES; True jika semua di bawah PHOTO_RSS_CEILING_MB"""
+    from utils_simple import PHOTO_RSS_CEILING_MB
+
+    # Seperti container (Dockerfile); diwarisi proses kasus
+    os.environ.setdefault('MALLOC_ARENA_MAX', '2')
+    ok = True
+    print(f"\n📏 Kasus RSS (batas {PHOTO_RSS_CEILING_MB} MB)")
+    for case in RSS_CASES:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_isolated({**case, 'photo_paths': write_photos(case, Path(tmp))}, ctx)
+        within = result['peak_rss_mb'] <= PHOTO_RSS_CEILING_MB
+        ok = ok and within
+        print(f"{'✅' if within else '❌'} {case_id(case):<44} {result['wall_s']:8.3f}s "
+              f"{result['peak_rss_mb']:7.1f}MB")
+    return ok
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {case_id(r): r for r in json.load(f)['results']}
+    print()
+    print(f"{'case':<36} {'wall':>9} {'vs base':>9} {'rss':>8} {'vs base':>9}")
+    for r in results:
+        base = baseline.get(case_id(r))
+        if not base:
+            continue
+        wall_ratio = r['wall_s'] / base['wall_s'] if base['wall_s'] else float('nan')
+        rss_ratio = r['peak_rss_mb'] / base['peak_rss_mb'] if base['peak_rss_mb'] else float('nan')
+        flag = '  ⚠️' if wall_ratio > 1.2 or rss_ratio > 1.2 else ''
+        print(f"{case_id(r):<36} {r['wall_s']:8.3f}s {wall_ratio:8.2f}x {r['peak_rss_mb']:6.1f}MB {rss_ratio:8.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_simple_pdf")
+    parser.add_argument('-o', '--output', default='bench_results.json', help="File hasil JSON")
+    parser.add_argument('--quick', action='store_true', help="Matriks kecil")
+    parser.add_argument('--repeat', type=int, default=1, help="Ulangi tiap kasus, ambil waktu tercepat")
+    parser.add_argument('--compare', help="File hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    cases = build_matrix(args.quick)
+    print(f"🏁 {len(cases)} kasus x {args.repeat}")
+
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    for case in cases:
+        runs = []
+        for _ in range(args.repeat):
+            runs.append(run_isolated(case, ctx))
+        best = min(runs, key=lambda r: r['wall_s'])
+        results.append(best)
+        print(f"{case_id(case):<36} {best['wall_s']:8.3f}s {best['peak_rss_mb']:7.1f}MB "
+              f"{best['output_bytes'] / 1024:9.1f}KB")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Hasil disimpan ke {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0 if check_rss(ctx) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark roster: build index + latensi autocomplete/resolve
+
+Roster sintetis (nama Indonesia yang banyak kembar kata depan) dengan
+query prefix, NPM, dan salah ketik.
+
+    python benchmarks/bench_roster.py
+    python benchmarks/bench_roster.py --students 10000
+"""
+
+import argparse
+import difflib
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from roster import RosterEntry, RosterIndex  # noqa: E402
+
+FIRST = ['Muhammad', 'Siti', 'Nurul', 'Dewi', 'Agus', 'Putri', 'Rizky', 'Ahmad', 'Budi', 'Fitri', 'Dimas', 'Ayu']
+LAST = ['Santoso', 'Rahmawati', 'Pratama', 'Hidayatullah', 'Wulandari', 'Ramadhan', 'Saputra', 'Lestari',
+        'Kurniawan', 'Maharani', 'Setiawan', 'Handayani', 'Nugroho', 'Permata', 'Firmansyah', 'Anggraini']
+
+
+def synthetic_roster(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    return [
+        RosterEntry(' '.join([rng.choice(FIRST)] + rng.sample(LAST, rng.randint(1, 2))), f'{2020 + i % 5}{i:06d}')
+        for i in range(n)
+    ]
+
+
+def typo(text: str, rng) -> str:
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1:] if rng.random() < 0.5 else text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def latency(fn, queries):
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times) * 1000, times[int(len(times) * 0.99) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index roster")
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    entries = synthetic_roster(args.students)
+    start = time.perf_counter()
+    index = RosterIndex(entries)
+    build = time.perf_counter() - start
+    print(f"students={args.students} build={build * 1000:.0f}ms")
+
+    sample = [rng.choice(entries) for _ in range(args.queries)]
+    cases = {
+        'prefix nama': (index.suggest, [e.nama[:rng.randint(2, 6)] for e in sample]),
+        'prefix 2 kata': (index.suggest, [' '.join(w[:3] for w in e.nama.split()[:2]) for e in sample]),
+        'npm': (index.suggest, [e.npm[:rng.randint(4, 10)] for e in sample]),
+        'typo (suggest)': (index.suggest, [typo(e.nama, rng) for e in sample]),
+        'typo (resolve)': (index.resolve, [typo(e.nama, rng) for e in sample]),
+        'exact (resolve)': (index.resolve, [e.nama.upper() for e in sample]),
+    }
+    print(f"{'query':<18} {'p50':>9} {'p99':>9}")
+    for name, (fn, queries) in cases.items():
+        p50, p99 = latency(fn, queries)
+        print(f"{name:<18} {p50:7.2f}ms {p99:7.2f}ms")
+
+    linear_start = time.perf_counter()
+    for entry in sample[:50]:
+        key = typo(entry.nama, rng).casefold()
+        max(entries, key=lambda e: difflib.SequenceMatcher(None, key, e.nama.casefold()).ratio())
+    linear = (time.perf_counter() - linear_start) / 50
+    print(f"pembanding: scan difflib linear {linear * 1000:.1f}ms per query")
+
+
+if __name__ == "__main__":
+    main()
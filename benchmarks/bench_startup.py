@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start: waktu import per modul aplikasi dan time-to-first-render
+
+Setiap pengukuran di proses Python baru (seperti container/replica baru):
+
+- import: `python -X importtime -c "import <modul>"`, total waktu import
+  dan import langsung termahal. Modul berat (fpdf, PIL, pandas, canvas)
+  yang ikut ter-import di luar yang sudah dibawa streamlit sendiri
+  dianggap regresi untuk jalur check-in.
+- first render: form absensi Streamlit (AppTest, dari start proses sampai
+  script selesai dijalankan) dan API check-in (dari start proses sampai
+  GET / pertama dijawab).
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 -o startup.json
+
+Exit code 1 jika budget terlampaui.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budget (detik) - container mahasiswa: 0.5 CPU / 256 MB
+FORM_RENDER_BUDGET = 2.5
+API_FIRST_RESPONSE_BUDGET = 0.5
+
+MODULES = ['checkin_api', 'mahasiswa_app', 'streamlit_app', 'utils_simple']
+# Modul yang tidak boleh ikut ter-import oleh jalur check-in
+CHECKIN_MODULES = ['checkin_api', 'mahasiswa_app']
+HEAVY = ['fpdf', 'PIL', 'pandas', 'streamlit_drawable_canvas', 'fontTools']
+
+FORM_SCRIPT = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=60).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+
+def _env(data_dir: str) -> dict:
+    env = dict(os.environ, LAPORAN_DATA_DIR=data_dir, PYTHONDONTWRITEBYTECODE='1')
+    env.pop('LAPORAN_METRICS_DIR', None)
+    return env
+
+
+def import_profile(module: str, env: dict) -> dict:
+    """Total waktu import (ms), import langsung termahal, dan modul berat yang ter-import"""
+    code = (f"import sys; import {module}; "
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'gagal'}
+
+    total_us, top = 0, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            # Import langsung dari modul yang diukur (cumulative termasuk dependensinya)
+            top.append((int(cumulative_us), name.strip()))
+    top.sort(reverse=True)
+    heavy = [m for m in proc.stdout.strip().split(',') if m]
+    return {
+        'import_ms': total_us / 1000,
+        'wall_ms': wall * 1000,
+        'top': [{'module': name, 'ms': us / 1000} for us, name in top[:8]],
+        'heavy': heavy,
+    }
+
+
+def form_first_render(env: dict):
+    """Detik dari start proses sampai form absensi selesai di-render (AppTest), atau None"""
+    script = FORM_SCRIPT.format(path=str(ROOT / 'mahasiswa_app.py'))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"   ⚠️ form: {(proc.stderr.strip().splitlines() or ['gagal'])[-1]}")
+        return None
+    return time.perf_counter() - start
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def api_first_response(env: dict, timeout: float = 10):
+    """Detik dari start proses checkin_api sampai GET / pertama dijawab, atau None"""
+    port = _free_port()
+    env = dict(env, CHECKIN_API_HOST='127.0.0.1', CHECKIN_API_PORT=str(port))
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, 'checkin_api.py'], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                return None
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time & time-to-first-render")
+    parser.add_argument('--runs', type=int, default=3, help="Pengulangan per pengukuran (median)")
+    parser.add_argument('--form-budget', type=float, default=FORM_RENDER_BUDGET)
+    parser.add_argument('--api-budget', type=float, default=API_FIRST_RESPONSE_BUDGET)
+    parser.add_argument('-o', '--output', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='bench_startup_') as data_dir:
+        env = _env(data_dir)
+        baseline = import_profile('streamlit', env)
+        baseline_heavy = set(baseline.get('heavy', []))
+
+        results = {'python': sys.version.split()[0], 'modules': {}}
+        print(f"{'modul':<16} {'import':>9} {'wall':>9}  modul berat")
+        for module in MODULES:
+            runs = [import_profile(module, env) for _ in range(args.runs)]
+            ok_runs = [r for r in runs if 'error' not in r]
+            if not ok_runs:
+                print(f"{module:<16} {'-':>9} {'-':>9}  ⚠️ {runs[0]['error']}")
+                results['modules'][module] = runs[0]
+                continue
+            result = dict(ok_runs[0],
+                          import_ms=_median([r['import_ms'] for r in ok_runs]),
+                          wall_ms=_median([r['wall_ms'] for r in ok_runs]))
+            extra = sorted(set(result['heavy']) - baseline_heavy)
+            result['extra_heavy'] = extra
+            results['modules'][module] = result
+            print(f"{module:<16} {result['import_ms']:7.0f}ms {result['wall_ms']:7.0f}ms  "
+                  f"{', '.join(extra) or '-'}")
+            if module in CHECKIN_MODULES and extra:
+                failures.append(f"{module} meng-import {', '.join(extra)}")
+
+        for module in CHECKIN_MODULES + ['streamlit_app']:
+            slowest = results['modules'][module].get('top', [])
+            if slowest:
+                print(f"\nImport termahal {module}:")
+                for item in slowest[:5]:
+                    print(f"   {item['ms']:8.1f} ms  {item['module']}")
+
+        form = _median([form_first_render(env) for _ in range(args.runs)])
+        api = _median([api_first_response(env) for _ in range(args.runs)])
+    results['form_first_render_s'] = form
+    results['api_first_response_s'] = api
+
+    print()
+    if form is None:
+        print("⏭️  Form absensi: tidak bisa diukur (streamlit tidak tersedia?)")
+    else:
+        print(f"✍️  Form absensi first render: {form:.2f}s (budget {args.form_budget}s)")
+        if form > args.form_budget:
+            failures.append(f"form {form:.2f}s > {args.form_budget}s")
+    if api is None:
+        print("⏭️  API check-in: tidak bisa diukur")
+        failures.append("API check-in tidak merespons")
+    else:
+        print(f"⚡ API check-in first response: {api * 1000:.0f}ms (budget {args.api_budget * 1000:.0f}ms)")
+        if api > args.api_budget:
+            failures.append(f"API {api:.2f}s > {args.api_budget}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    print("✅ Dalam budget" if not failures else "❌ " + '; '.join(failures))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
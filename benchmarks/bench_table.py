@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark tabel KEHADIRAN untuk daftar besar
+
+Render render_kehadiran_table untuk N baris (default 5000) dan cek
+terhadap budget waktu dan memori. Waktu dan memori diukur dalam dua run
+terpisah (tracemalloc memperlambat alokasi, jadi tidak aktif saat diukur
+waktunya). Exit code 1 jika budget terlampaui.
+
+    python benchmarks/bench_table.py
+    python benchmarks/bench_table.py --rows 10000 --max-seconds 10
+"""
+
+import argparse
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils_simple import LaporanPDF, render_kehadiran_table  # noqa: E402
+
+# Budget untuk 5000 baris (container dosen: 1 CPU / 512 MB)
+MAX_SECONDS = 5.0
+MAX_PEAK_MB = 150.0
+
+
+def synthetic_rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = ['Muhammad', 'Siti', 'Nurul', 'Rahmawati', 'Pratama', 'Hidayatullah', 'Wulandari',
+             'Ramadhan', 'Kusumaningrum', 'Putra', 'Syahputra', 'Anggraini']
+    return [
+        {
+            'nama': ' '.join(rng.choice(words) for _ in range(rng.randint(2, 6))),
+            'npm': f"{2019 + i % 5}{i:08d}",
+            'status': rng.choice(['Hadir', 'Hadir', 'Tidak Hadir', 'Izin', 'Sakit']),
+        }
+        for i in range(n)
+    ]
+
+
+def render(rows):
+    """(pdf, detik render tabel, bytes output)"""
+    start = time.perf_counter()
+    pdf = LaporanPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    render_kehadiran_table(pdf, rows)
+    render_time = time.perf_counter() - start
+    return pdf, render_time, pdf.output()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tabel kehadiran")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--max-seconds', type=float, default=MAX_SECONDS)
+    parser.add_argument('--max-peak-mb', type=float, default=MAX_PEAK_MB)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+
+    # Run 1: waktu (tanpa tracemalloc)
+    start = time.perf_counter()
+    pdf, render_time, output = render(rows)
+    total_time = time.perf_counter() - start
+    del pdf, output
+
+    # Run 2: puncak memori Python
+    tracemalloc.start()
+    pdf, _, output = render(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_mb = peak / 1024 / 1024
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"rows={args.rows} pages={pdf.page_no()} render={render_time:.2f}s total={total_time:.2f}s "
+          f"py_peak={peak_mb:.1f}MB rss={rss_mb:.1f}MB size={len(output) / 1024:.0f}KB")
+
+    ok = total_time <= args.max_seconds and peak_mb <= args.max_peak_mb
+    print("✅ Dalam budget" if ok else f"❌ Melebihi budget ({args.max_seconds}s / {args.max_peak_mb}MB)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
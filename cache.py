@@ -0,0 +1,120 @@
+"""
+Cache on-disk berbasis content hash dengan batas ukuran (LRU)
+
+Dipakai untuk hasil render PDF: key = hash stabil dari isi laporan,
+tanda tangan, dan foto; value = bytes PDF.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+CACHE_DIR = Path(os.getenv('LAPORAN_CACHE_DIR', Path(tempfile.gettempdir()) / 'laporan_temp' / 'cache'))
+
+
+def stable_hash(*parts) -> str:
+    """sha256 dari gabungan bagian (bytes apa adanya, selain itu JSON dengan key terurut)"""
+    h = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray, memoryview)):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        h.update(len(part).to_bytes(8, 'big'))
+        h.update(part)
+    return h.hexdigest()
+
+
+class DiskLRUCache:
+    """Satu file per entry; waktu akses disimpan di mtime, entry terlama dibuang
+    saat total ukuran melebihi max_bytes."""
+
+    def __init__(self, directory, max_bytes: int, suffix: str = ''):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return (p for p in self.directory.glob(f'*{self.suffix}') if not p.name.startswith('.'))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}{self.suffix}'
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(value)
+        with self._lock:
+            try:
+                self._size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)
+            self._size += len(value)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Buang entry paling lama diakses sampai di bawah batas"""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for p in self._entries():
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
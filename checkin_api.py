@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+API absensi ringan (asyncio, tanpa dependency) - Port 8503
+
+Untuk lonjakan check-in saat kuliah dimulai: satu request HTTP kecil per
+mahasiswa, tanpa websocket/script run Streamlit. Menulis lewat storage
+yang sama dengan aplikasi dosen & mahasiswa; check-in bersamaan digabung
+oleh group commit (storage.get_coalescer) menjadi satu transaksi.
+
+    GET  /                      form absensi statis
+    POST /api/checkin           {"nama", "npm", "status", "keterangan", "sesi"}
+    GET  /api/summary?sesi=<id> ringkasan per status
+    GET  /api/sessions          daftar sesi
+    GET  /api/roster?sesi=&q=   saran nama dari daftar kelas (autocomplete)
+    GET  /api/stats             metrik group commit
+    GET  /metrics               metrik proses ini (format Prometheus)
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from metrics import render_prometheus, span, start_file_export
+from models import Mahasiswa, ValidationError
+from roster import get_roster, roster_key
+from storage import get_coalescer, get_store, list_sessions
+
+HOST = os.getenv('CHECKIN_API_HOST', '0.0.0.0')
+PORT = int(os.getenv('CHECKIN_API_PORT', '8503'))
+MAX_BODY = 4096
+MAX_HEADER_LINES = 50
+READ_TIMEOUT = 10
+
+# Baca storage di thread terpisah supaya event loop tidak terblokir
+# saat SQLite menunggu lock dari container lain (tulis lewat thread group commit)
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='checkin-db')
+
+FORM_HTML = """<!doctype html>
+<html lang="id"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Absensi Mahasiswa</title>
+<style>
+body{font-family:sans-serif;max-width:420px;margin:2em auto;padding:0 1em}
+input,select,textarea,button{width:100%;margin:.3em 0 .8em;padding:.5em;box-sizing:border-box}
+button{background:#1f77b4;color:#fff;border:0;border-radius:4px}
+#msg{font-weight:bold}
+</style></head><body>
+<h2>&#9997;&#65039; Form Absensi Mahasiswa</h2>
+<form id="f">
+<label>Sesi Kuliah</label><select name="sesi" id="sesi"><option value="">Sesi default</option></select>
+<label>Nama Lengkap *</label><input name="nama" required maxlength="100" list="roster" autocomplete="off">
+<datalist id="roster"></datalist>
+<label>NPM (opsional)</label><input name="npm" maxlength="20">
+<label>Status Kehadiran *</label><select name="status">
+<option>Hadir</option><option>Tidak Hadir</option><option>Izin</option><option>Sakit</option></select>
+<label>Keterangan (opsional)</label><textarea name="keterangan" maxlength="300"></textarea>
+<button>Kirim Absensi</button></form>
+<p id="msg"></p>
+<script>
+const q=new URLSearchParams(location.search).get('sesi');
+fetch('/api/sessions').then(r=>r.json()).then(list=>{const s=document.getElementById('sesi');
+list.forEach((x,i)=>{const o=new Option(x.matkul+' - '+x.tanggal,x.id);s.add(o,i);});
+s.value=q||(list[0]?list[0].id:'');});
+let t;const f=document.getElementById('f'),dl=document.getElementById('roster');let saran=[];
+f.nama.oninput=()=>{clearTimeout(t);const v=f.nama.value.trim();
+const m=saran.find(x=>x.nama===v);if(m&&m.npm!=='-')f.npm.value=m.npm;
+if(v.length<2||m)return;t=setTimeout(async()=>{
+const r=await fetch('/api/roster?sesi='+encodeURIComponent(f.sesi.value)+'&q='+encodeURIComponent(v));
+saran=r.ok?await r.json():[];dl.replaceChildren(...saran.map(x=>new Option(x.npm!=='-'?x.npm:'',x.nama)));},150);};
+f.onsubmit=async e=>{e.preventDefault();
+const d=Object.fromEntries(new FormData(e.target));
+const r=await fetch('/api/checkin',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(d)});
+const j=await r.json();document.getElementById('msg').textContent=r.ok?
+'\\u2705 Absensi '+d.nama+(j.updated?' berhasil diperbarui!':' berhasil disimpan!'):'\\u274C '+j.error;
+if(r.ok)e.target.nama.value='';};
+</script></body></html>
+"""
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class BadRequest(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _sesi(value):
+    """ID sesi dari request: None untuk sesi default, selain itu harus string"""
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise BadRequest("Sesi tidak valid")
+    return value
+
+
+def _store(sesi):
+    """Store sesi yang sudah terdaftar; API tidak pernah membuat partisi baru"""
+    try:
+        return get_store(session=sesi, create=False)
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+
+def _coalescer(sesi):
+    try:
+        return get_coalescer(session=sesi, create=False)
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+
+def parse_checkin(payload: dict, roster=None) -> dict:
+    """Validasi payload check-in (dan cocokkan ke roster jika ada), return argumen upsert"""
+    try:
+        mhs = Mahasiswa.create(
+            nama=payload.get('nama'),
+            status=payload.get('status') or 'Hadir',
+            npm=payload.get('npm'),
+            keterangan=payload.get('keterangan'),
+            waktu_absen=datetime.now().strftime("%H:%M:%S")
+        )
+        if roster:
+            mhs = roster.canonical(mhs)
+    except ValidationError as e:
+        raise BadRequest(str(e))
+    return mhs.upsert_args()
+
+
+async def checkin(payload: dict) -> dict:
+    """Upsert satu check-in; selesai setelah batch group commit-nya durable"""
+    sesi = _sesi(payload.get('sesi'))
+    roster = await asyncio.get_running_loop().run_in_executor(_executor, load_roster, sesi)
+    entry = parse_checkin(payload, roster)
+    coalescer = _coalescer(sesi)
+    updated = await asyncio.wrap_future(coalescer.submit(**entry))
+    result = await asyncio.get_running_loop().run_in_executor(_executor, summary, sesi)
+    return {'ok': True, 'updated': updated, 'summary': result}
+
+
+def load_roster(sesi):
+    """Roster mata kuliah sesi (sesi default: dari matkul yang tersimpan), atau None"""
+    store = _store(sesi)
+    try:
+        matkul = '' if sesi else store.get_meta('matkul', '')
+        return get_roster(roster_key(sesi, matkul))
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+
+def suggest(sesi, query: str) -> list:
+    roster = load_roster(sesi)
+    if roster is None:
+        return []
+    return [{'nama': entry.nama, 'npm': entry.npm} for entry in roster.suggest(query)]
+
+
+def summary(sesi) -> dict:
+    return _store(sesi).summary()
+
+
+async def handle_request(method: str, target: str, body: bytes):
+    """Return (status, content_type, body_bytes)"""
+    url = urlsplit(target)
+    query = {k: v[0] for k, v in parse_qs(url.query).items()}
+    loop = asyncio.get_running_loop()
+
+    if url.path == '/':
+        if method != 'GET':
+            raise BadRequest("Method tidak didukung", 405)
+        return 200, 'text/html; charset=utf-8', FORM_HTML.encode('utf-8')
+
+    if url.path == '/api/checkin':
+        if method != 'POST':
+            raise BadRequest("Gunakan POST", 405)
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise BadRequest("Body harus JSON")
+        if not isinstance(payload, dict):
+            raise BadRequest("Body harus objek JSON")
+        payload.setdefault('sesi', query.get('sesi'))
+        with span('checkin'):
+            result = await checkin(payload)
+        return 200, 'application/json', _json(result)
+
+    if url.path == '/api/summary' and method == 'GET':
+        result = await loop.run_in_executor(_executor, summary, _sesi(query.get('sesi')))
+        return 200, 'application/json', _json(result)
+
+    if url.path == '/api/sessions' and method == 'GET':
+        return 200, 'application/json', _json(list_sessions())
+
+    if url.path == '/api/roster' and method == 'GET':
+        result = await loop.run_in_executor(_executor, suggest, _sesi(query.get('sesi')), query.get('q', '')[:100])
+        return 200, 'application/json', _json(result)
+
+    if url.path == '/metrics' and method == 'GET':
+        return 200, 'text/plain; version=0.0.4; charset=utf-8', render_prometheus().encode('utf-8')
+
+    if url.path == '/api/stats' and method == 'GET':
+        return 200, 'application/json', _json(_coalescer(_sesi(query.get('sesi'))).stats())
+
+    raise BadRequest("Tidak ditemukan", 404)
+
+
+def _json(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise BadRequest("Request tidak valid")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise BadRequest("Header terlalu banyak")
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise BadRequest("Content-Length tidak valid")
+    if length < 0 or length > MAX_BODY:
+        raise BadRequest("Body terlalu besar", 413)
+    body = await reader.readexactly(length) if length else b''
+
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    return method.upper(), target, body, keep_alive
+
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await asyncio.wait_for(_read_request(reader), READ_TIMEOUT)
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, content_type, payload = await handle_request(method, target, body)
+            except BadRequest as e:
+                status, content_type, payload = e.status, 'application/json', _json({'ok': False, 'error': str(e)})
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                print(f"Check-in API error: {e}")
+                status, content_type, payload = 500, 'application/json', _json({'ok': False, 'error': 'Server error'})
+
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Cache-Control: no-store\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def main():
+    start_file_export('checkin_api')
+    server = await asyncio.start_server(handle_connection, HOST, PORT, backlog=1024)
+    print(f"✍️ Check-in API berjalan di http://{HOST}:{PORT}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
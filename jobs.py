@@ -0,0 +1,144 @@
+"""
+Antrian job PDF di background
+
+Render PDF dijalankan oleh worker pool terbatas (bukan di thread script
+Streamlit). UI cukup menyimpan job id, lalu polling status + progress dan
+mengambil hasil dengan take() setelah selesai (job lepas dari antrian, PDF
+tidak ditahan dua kali). Jika antrian penuh, submit ditolak (admission
+control) supaya container 1 CPU / 512 MB tidak kewalahan.
+"""
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+PDF_WORKERS = int(os.getenv('LAPORAN_PDF_WORKERS', '1'))
+# Maksimum job yang antri + sedang diproses
+PDF_QUEUE_SIZE = int(os.getenv('LAPORAN_PDF_QUEUE', '4'))
+# Hasil job yang sudah selesai disimpan sekian detik
+JOB_TTL = int(os.getenv('LAPORAN_JOB_TTL', '600'))
+# Total bytes hasil yang belum diambil; lebih dari ini hasil terlama dibuang
+JOB_RESULT_MB = int(os.getenv('LAPORAN_JOB_RESULT_MB', '64'))
+
+ANTRI = 'antri'
+PROSES = 'proses'
+SELESAI = 'selesai'
+GAGAL = 'gagal'
+
+
+class QueueFull(Exception):
+    """Antrian job penuh"""
+
+
+class Job:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = ANTRI
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SELESAI, GAGAL)
+
+    def update(self, **progress):
+        """Callback progress dari worker (mis. photos=3, pages=2)"""
+        self.progress.update(progress)
+
+
+class JobQueue:
+    def __init__(self, workers: int = PDF_WORKERS, max_jobs: int = PDF_QUEUE_SIZE,
+                 max_result_bytes: int = JOB_RESULT_MB * 1024 * 1024):
+        self.max_jobs = max_jobs
+        self.max_result_bytes = max_result_bytes
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='pdf-job')
+        self._jobs: Dict[str, Job] = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Jalankan fn(*args, progress=job.update, **kwargs) di background. Return job id.
+
+        Raise QueueFull jika sudah ada max_jobs job yang antri/diproses.
+        """
+        with self._lock:
+            self._purge()
+            if self._active >= self.max_jobs:
+                raise QueueFull(f"Antrian penuh ({self._active} job)")
+            job = Job(f'{os.getpid()}-{next(self._ids)}')
+            self._jobs[job.id] = job
+            self._active += 1
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status = PROSES
+        status = GAGAL
+        try:
+            job.result = fn(*args, progress=job.update, **kwargs)
+            status = SELESAI
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            # finished/result/error diisi sebelum status dipublikasikan: submit()
+            # di thread lain bisa menjalankan _purge kapan saja
+            job.finished = time.time()
+            job.status = status
+            with self._lock:
+                self._active -= 1
+                self._purge()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def take(self, job_id: str) -> Optional[Job]:
+        """Job yang sudah selesai, sekaligus dilepas dari antrian (hasilnya
+        milik pemanggil). None jika tidak ada atau belum selesai."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.done:
+                return None
+            return self._jobs.pop(job_id)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._active
+
+    def _purge(self):
+        """Buang hasil job lama supaya memori tidak terus bertambah: yang lewat
+        JOB_TTL, lalu yang terlama sampai total hasil <= max_result_bytes"""
+        cutoff = time.time() - JOB_TTL
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+        held = sorted((j for j in self._jobs.values() if j.status == SELESAI and j.result is not None),
+                      key=lambda j: j.finished or 0)
+        total = sum(len(j.result) for j in held)
+        for job in held:
+            if total <= self.max_result_bytes:
+                break
+            total -= len(job.result)
+            # Status tetap terlihat oleh UI yang masih polling
+            job.result = None
+            job.error = "Hasil PDF tidak diambil dan sudah dibuang, silakan generate ulang"
+            job.status = GAGAL
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """Antrian job bersama untuk seluruh sesi dalam proses ini"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -4,11 +4,14 @@ Form Absensi Mahasiswa - Port 8502
 Aplikasi terpisah untuk mahasiswa input absensi
 """
 
-import json
 import streamlit as st
-from pathlib import Path
 from datetime import datetime
 
+from metrics import profile, span, start_file_export, timed
+from models import STATUS_LIST, Mahasiswa, ValidationError
+from roster import get_roster, roster_key
+from storage import get_coalescer, get_store, list_sessions
+
 # Configure
 st.set_page_config(
     page_title="Absensi Mahasiswa",
@@ -16,20 +19,23 @@ st.set_page_config(
     layout="centered"
 )
 
-# Data file - SAMA dengan aplikasi dosen
-DATA_FILE = Path('laporan_data.json')
-
-def load_data():
-    """Load data dari JSON"""
-    if DATA_FILE.exists():
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return {'mahasiswa': []}
+def pilih_sesi():
+    """Pilih sesi kuliah (partisi matkul + tanggal). Link langsung: ?sesi=<id>"""
+    sessions = list_sessions()
+    if not sessions:
+        return None
+    
+    ids = [s['id'] for s in sessions] + [None]
+    labels = {s['id']: f"{s['matkul']} - {s['tanggal']}" for s in sessions}
+    labels[None] = "Sesi default"
+    requested = st.query_params.get('sesi') if hasattr(st, 'query_params') else None
+    index = ids.index(requested) if requested in ids else 0
+    return st.selectbox("📚 Sesi Kuliah", ids, index=index, format_func=labels.get)
 
-def save_data(data):
-    """Save data ke JSON"""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+@timed('load_data')
+def load_data(store):
+    """Load data dari store (cache bersama antar sesi, dibaca ulang hanya jika ada perubahan)"""
+    return store.load_cached()
 
 def main():
     """Form absensi mahasiswa"""
@@ -37,8 +43,12 @@ def main():
     st.title("✍️ Form Absensi Mahasiswa")
     st.markdown("---")
     
+    # Data store sesi terpilih - SAMA dengan aplikasi dosen
+    sesi = pilih_sesi()
+    store = get_store(session=sesi, create=False)
+    
     # Load data
-    data = load_data()
+    data = load_data(store)
     
     # Show info kuliah if available
     if data.get('matkul'):
@@ -46,58 +56,58 @@ def main():
     
     st.markdown("### Isi Data Absensi Anda")
     
+    # Jika dosen sudah import daftar kelas: cari nama/NPM di roster (di luar
+    # form supaya saran muncul saat mengetik), check-in dicocokkan ke entry roster
+    roster = get_roster(roster_key(sesi, data.get('matkul')))
+    pilihan = None
+    if roster:
+        cari = st.text_input("Cari Nama / NPM *", placeholder="Ketik sebagian nama atau NPM, lalu Enter")
+        saran = roster.suggest(cari) if cari.strip() else []
+        if saran:
+            pilihan = st.radio("Pilih nama Anda", saran, format_func=lambda e: e.label())
+        elif cari.strip():
+            st.warning("Tidak ada nama yang cocok di daftar kelas")
+    
     # Form
     with st.form("form_absensi", clear_on_submit=True):
-        col1, col2 = st.columns(2)
+        if roster:
+            nama, npm = (pilihan.nama, pilihan.npm) if pilihan else ('', '')
+        else:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                nama = st.text_input("Nama Lengkap *", placeholder="Contoh: Budi Santoso")
+            
+            with col2:
+                npm = st.text_input("NPM (opsional)", placeholder="Contoh: 20210001")
         
-        with col1:
-            nama = st.text_input("Nama Lengkap *", placeholder="Contoh: Budi Santoso")
-        
-        with col2:
-            npm = st.text_input("NPM (opsional)", placeholder="Contoh: 20210001")
-        
-        status = st.selectbox("Status Kehadiran *", ["Hadir", "Tidak Hadir", "Izin", "Sakit"])
+        status = st.selectbox("Status Kehadiran *", STATUS_LIST)
         
         keterangan = st.text_area("Keterangan (opsional)", placeholder="Tulis keterangan jika ada...")
         
         submitted = st.form_submit_button("✅ Kirim Absensi", use_container_width=True, type="primary")
         
         if submitted:
-            if nama:
-                mahasiswa = data.get('mahasiswa', [])
-                
-                # Check if already exists by name
-                existing = next((m for m in mahasiswa if m['nama'].lower() == nama.lower()), None)
+            try:
+                # Validasi + normalisasi sekali di sini
+                mhs = Mahasiswa.create(nama, status, npm, keterangan, datetime.now().strftime("%H:%M:%S"))
+                if roster:
+                    mhs = roster.canonical(mhs)
+            except ValidationError as e:
+                st.error(f"❌ {e}")
+            else:
+                # Upsert satu mahasiswa (dicocokkan lewat NPM / nama ternormalisasi),
+                # digabung dengan submit lain dalam satu group commit
+                with span('checkin'):
+                    updated = get_coalescer(session=sesi, create=False).upsert_mahasiswa(**mhs.upsert_args())
                 
-                if existing:
-                    # Update existing
-                    existing['status'] = status
-                    if npm:
-                        existing['npm'] = npm
-                    if keterangan:
-                        existing['keterangan'] = keterangan
-                    existing['waktu_absen'] = datetime.now().strftime("%H:%M:%S")
-                    st.success(f"✅ Absensi **{nama}** berhasil diperbarui!")
+                if updated:
+                    st.success(f"✅ Absensi **{mhs.nama}** berhasil diperbarui!")
                 else:
-                    # Add new
-                    new_entry = {
-                        'nama': nama,
-                        'npm': npm if npm else '-',
-                        'status': status,
-                        'waktu_absen': datetime.now().strftime("%H:%M:%S")
-                    }
-                    if keterangan:
-                        new_entry['keterangan'] = keterangan
-                    
-                    mahasiswa.append(new_entry)
-                    st.success(f"✅ Absensi **{nama}** berhasil disimpan!")
+                    st.success(f"✅ Absensi **{mhs.nama}** berhasil disimpan!")
                 
-                data['mahasiswa'] = mahasiswa
-                save_data(data)
+                data = load_data(store)
                 st.balloons()
-                
-            else:
-                st.error("❌ Nama harus diisi!")
     
     st.markdown("---")
     
@@ -106,24 +116,23 @@ def main():
     if mahasiswa:
         st.markdown("### 📋 Daftar Absensi Hari Ini")
         
-        # Stats
+        # Stats - ringkasan dipelihara oleh store saat upsert
+        summary = store.summary()
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total", len(mahasiswa))
+            st.metric("Total", summary['total'])
         with col2:
-            hadir = len([m for m in mahasiswa if m['status'] == 'Hadir'])
-            st.metric("Hadir", hadir)
+            st.metric("Hadir", summary['Hadir'])
         with col3:
-            tidak_hadir = len([m for m in mahasiswa if m['status'] != 'Hadir'])
-            st.metric("Tidak Hadir", tidak_hadir)
+            st.metric("Tidak Hadir", summary['total'] - summary['Hadir'])
         
         st.markdown("---")
         
         # List
         for i, mhs in enumerate(mahasiswa, 1):
-            status_icon = "✅" if mhs['status'] == 'Hadir' else "❌"
-            waktu = mhs.get('waktu_absen', '-')
-            st.write(f"{i}. {status_icon} **{mhs['nama']}** ({mhs.get('npm', '-')}) - {mhs['status']} - {waktu}")
+            status_icon = "✅" if mhs.status == 'Hadir' else "❌"
+            waktu = mhs.waktu_absen or '-'
+            st.write(f"{i}. {status_icon} **{mhs.nama}** ({mhs.npm}) - {mhs.status} - {waktu}")
     else:
         st.info("Belum ada yang absen hari ini")
     
@@ -137,4 +146,6 @@ def main():
     )
 
 if __name__ == "__main__":
-    main()
+    start_file_export('mahasiswa')
+    with span('rerun', app='mahasiswa'), profile('mahasiswa'):
+        main()
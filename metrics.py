@@ -0,0 +1,224 @@
+"""
+Metrik waktu hot path (histogram) + export format teks Prometheus
+
+    with span('load_data'):
+        ...
+
+    @timed('save_data')
+    def save_data(data): ...
+
+Histogram per proses; diekspor lewat endpoint /metrics (checkin_api) atau
+file <LAPORAN_METRICS_DIR>/<job>.prom yang ditulis ulang berkala (format
+textfile collector node_exporter). Dengan LOG_LEVEL=DEBUG, profile(...)
+menyimpan cProfile per request ke LAPORAN_PROFILE_DIR.
+"""
+
+import functools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Tuple
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Direktori file .prom (kosong = tidak ditulis ke file)
+METRICS_DIR = os.getenv('LAPORAN_METRICS_DIR', '')
+METRICS_INTERVAL = float(os.getenv('LAPORAN_METRICS_INTERVAL', '15'))
+PROFILE_DIR = Path(os.getenv('LAPORAN_PROFILE_DIR', Path(tempfile.gettempdir()) / 'laporan_temp' / 'profile'))
+PROFILE_TOP = 15
+
+# Batas bucket durasi (detik)
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """Histogram kumulatif ala Prometheus, satu seri per kombinasi label"""
+
+    def __init__(self, name: str, help_text: str, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [count per bucket..., +Inf, sum]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Tuple, Dict]:
+        """{labels: {'buckets': {le: kumulatif}, 'count': n, 'sum': s}}"""
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        result = {}
+        for key, series in items:
+            cumulative, buckets = 0, {}
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                buckets[_format_value(bound)] = cumulative
+            count = cumulative + series[len(self.buckets)]
+            buckets['+Inf'] = count
+            result[key] = {'buckets': buckets, 'count': count, 'sum': series[-1]}
+        return result
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for key, series in sorted(self.snapshot().items()):
+            for le, n in series['buckets'].items():
+                lines.append(f'{self.name}_bucket{_format_labels(key + (("le", le),))} {n}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {series["sum"]:.6f}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {series["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(key) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in key) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_registry: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name: str, help_text: str, buckets=TIME_BUCKETS) -> Histogram:
+    """Histogram terdaftar (satu instance per nama dalam proses)"""
+    with _registry_lock:
+        hist = _registry.get(name)
+        if hist is None:
+            hist = _registry[name] = Histogram(name, help_text, buckets)
+        return hist
+
+
+SPAN_SECONDS = histogram('laporan_span_seconds', 'Durasi span hot path (detik)')
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Catat durasi blok ke laporan_span_seconds{span=name} (juga jika error)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - start, span=name, **labels)
+
+
+def timed(name: str):
+    """Decorator: seluruh pemanggilan fungsi sebagai satu span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Phases:
+    """Span berurutan tanpa nesting: mark(nama) mencatat durasi sejak mark sebelumnya"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._last = time.perf_counter()
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        SPAN_SECONDS.observe(now - self._last, span=f'{self.prefix}.{name}')
+        self._last = now
+
+
+@contextmanager
+def profile(name: str):
+    """Dengan LOG_LEVEL=DEBUG: cProfile blok ini, simpan .pstats ke PROFILE_DIR
+    dan cetak fungsi termahal. Selain itu tidak melakukan apa-apa."""
+    if LOG_LEVEL != 'DEBUG':
+        yield
+        return
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Profiler lain sedang aktif (mis. request lain di thread lain)
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            path = PROFILE_DIR / f'{name}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{threading.get_ident()}.pstats'
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            print(f"🔍 Profile {name}: {elapsed * 1000:.1f} ms -> {path}\n{out.getvalue()}")
+        except OSError as e:
+            print(f"Could not write profile: {e}")
+
+
+def render_prometheus() -> str:
+    """Semua histogram dalam format teks Prometheus"""
+    with _registry_lock:
+        hists = list(_registry.values())
+    return ''.join(hist.render() for hist in hists)
+
+
+def write_prometheus(path):
+    """Tulis metrik ke file (atomic, aman dibaca scraper kapan saja)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_text(render_prometheus())
+    os.replace(tmp, path)
+
+
+_exporters = set()
+
+
+def start_file_export(job: str, directory: str = None, interval: float = METRICS_INTERVAL):
+    """Tulis <directory>/<job>.prom setiap interval detik di background.
+    Tidak melakukan apa-apa jika LAPORAN_METRICS_DIR kosong; aman dipanggil berulang."""
+    directory = directory or METRICS_DIR
+    if not directory:
+        return
+    path = Path(directory) / f'{job}.prom'
+    with _registry_lock:
+        if path in _exporters:
+            return
+        _exporters.add(path)
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                write_prometheus(path)
+            except OSError as e:
+                print(f"Metrics export error: {e}")
+
+    threading.Thread(target=run, name=f'metrics-{job}', daemon=True).start()
@@ -0,0 +1,205 @@
+"""
+Model data absensi & laporan (dataclass dengan __slots__)
+
+- Mahasiswa: satu baris absensi. Mahasiswa.create() memvalidasi input
+  (form, API); Mahasiswa.from_dict() untuk data yang sudah tersimpan.
+- Laporan: data satu laporan. Laporan.from_dict() meng-coerce field teks
+  sekali; validate() menggantikan validate_laporan_data.
+
+Teks untuk PDF (clean_string) dihitung sekali per objek lalu disimpan,
+jadi baris dari load_cached() yang sama tidak dibersihkan ulang di setiap
+render. dumps()/loads() memakai orjson jika terpasang, selain itu json.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+STATUS_LIST = ['Hadir', 'Tidak Hadir', 'Izin', 'Sakit']
+
+MAX_NAMA = 100
+MAX_NPM = 20
+MAX_KETERANGAN = 300
+
+TEXT_FIELDS = ['matkul', 'sks', 'dosen', 'prodi', 'jam', 'tanggal', 'ttd_tempat', 'ttd_tanggal',
+               'ttd_nama', 'link_presentasi', 'link_rekaman']
+
+
+class ValidationError(ValueError):
+    """Input tidak valid (pesan siap ditampilkan ke pengguna)"""
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialisasi JSON (UTF-8 bytes)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON dari bytes/str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _clean(text) -> str:
+    from utils_simple import clean_string
+    return clean_string(text)
+
+
+@dataclass(slots=True)
+class Mahasiswa:
+    nama: str
+    npm: str = '-'
+    status: str = 'Hadir'
+    keterangan: str = ''
+    waktu_absen: str = ''
+    # (nama, npm, hadir) siap render, dihitung saat pertama kali dibutuhkan
+    _pdf: Optional[tuple] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def create(cls, nama, status='Hadir', npm='', keterangan='', waktu_absen='') -> 'Mahasiswa':
+        """Validasi + normalisasi input absensi. Raise ValidationError."""
+        nama = ' '.join(str(nama or '').split())
+        npm = str(npm or '').strip()
+        keterangan = str(keterangan or '').strip()
+        if not nama:
+            raise ValidationError("Nama harus diisi!")
+        if len(nama) > MAX_NAMA or len(npm) > MAX_NPM or len(keterangan) > MAX_KETERANGAN:
+            raise ValidationError("Isian terlalu panjang")
+        if status not in STATUS_LIST:
+            raise ValidationError(f"Status harus salah satu dari: {', '.join(STATUS_LIST)}")
+        return cls(nama, npm or '-', status, keterangan, str(waktu_absen or ''))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Mahasiswa':
+        """Dari format tersimpan (tanpa validasi)"""
+        return cls(data['nama'], data.get('npm') or '-', data['status'],
+                   data.get('keterangan') or '', data.get('waktu_absen') or '')
+
+    def to_dict(self) -> Dict:
+        """Format tersimpan (JSON lama): field opsional yang kosong tidak disertakan"""
+        data = {'nama': self.nama, 'npm': self.npm, 'status': self.status}
+        if self.waktu_absen:
+            data['waktu_absen'] = self.waktu_absen
+        if self.keterangan:
+            data['keterangan'] = self.keterangan
+        return data
+
+    def upsert_args(self) -> Dict:
+        """Argumen untuk store.upsert_mahasiswa / coalescer.submit"""
+        return {
+            'nama': self.nama,
+            'status': self.status,
+            'npm': self.npm if self.npm != '-' else '',
+            'keterangan': self.keterangan,
+            'waktu_absen': self.waktu_absen,
+        }
+
+    def update(self, entry: Dict):
+        """Terapkan record upsert ke baris yang sudah ada"""
+        self.status = entry['status']
+        if entry.get('npm'):
+            self.npm = entry['npm']
+        if entry.get('keterangan'):
+            self.keterangan = entry['keterangan']
+        if entry.get('waktu_absen'):
+            self.waktu_absen = entry['waktu_absen']
+        self._pdf = None
+
+    def copy(self) -> 'Mahasiswa':
+        return Mahasiswa(self.nama, self.npm, self.status, self.keterangan, self.waktu_absen, self._pdf)
+
+    def pdf_fields(self) -> tuple:
+        """(nama, npm, hadir) yang sudah dibersihkan untuk font laporan"""
+        if self._pdf is None:
+            self._pdf = (_clean(self.nama), _clean(self.npm), self.status.strip().lower() == 'hadir')
+        return self._pdf
+
+    # Akses gaya dict, untuk kode yang masih memperlakukan baris sebagai dict
+    def __getitem__(self, key: str):
+        if key.startswith('_') or key not in Mahasiswa.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return value if value != '' else default
+
+
+def as_mahasiswa(row) -> Mahasiswa:
+    """Baris absensi sebagai Mahasiswa (dict lama dikonversi)"""
+    return row if isinstance(row, Mahasiswa) else Mahasiswa.from_dict(row)
+
+
+def copy_mahasiswa(row) -> Mahasiswa:
+    """Salinan baris sebagai Mahasiswa baru (aman dimodifikasi)"""
+    return row.copy() if isinstance(row, Mahasiswa) else Mahasiswa.from_dict(row)
+
+
+@dataclass(slots=True)
+class Laporan:
+    matkul: str = ''
+    sks: str = ''
+    dosen: str = ''
+    prodi: str = ''
+    jam: str = ''
+    tanggal: str = ''
+    ttd_tempat: str = ''
+    ttd_tanggal: str = ''
+    ttd_nama: str = ''
+    link_presentasi: str = ''
+    link_rekaman: str = ''
+    mahasiswa: List[Mahasiswa] = field(default_factory=list)
+    catatan: List[str] = field(default_factory=list)
+    signature: Optional[str] = None
+    signature_ref: Optional[str] = None
+    # Teks yang sudah dibersihkan untuk PDF, dihitung sekali
+    _pdf: Optional[Dict] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Laporan':
+        """Dari dict (session state / store); field teks di-coerce ke str sekali"""
+        text = {key: '' if data.get(key) is None else str(data[key]) for key in TEXT_FIELDS}
+        return cls(
+            **text,
+            mahasiswa=[as_mahasiswa(m) for m in data.get('mahasiswa') or []],
+            catatan=[str(note) for note in data.get('catatan') or []],
+            signature=data.get('signature'),
+            signature_ref=data.get('signature_ref'),
+        )
+
+    def to_dict(self) -> Dict:
+        data = {key: getattr(self, key) for key in TEXT_FIELDS}
+        data['mahasiswa'] = [m.to_dict() for m in self.mahasiswa]
+        data['catatan'] = list(self.catatan)
+        data['signature'] = self.signature
+        data['signature_ref'] = self.signature_ref
+        return data
+
+    def validate(self) -> tuple:
+        """(True, "OK") atau (False, pesan)"""
+        if not self.matkul:
+            return False, "Mata kuliah harus diisi"
+        if not self.dosen:
+            return False, "Nama dosen harus diisi"
+        if not self.mahasiswa:
+            return False, "Data mahasiswa harus diisi"
+        return True, "OK"
+
+    def pdf_text(self) -> Dict:
+        """Field teks + catatan yang sudah dibersihkan untuk font laporan"""
+        if self._pdf is None:
+            text = {key: _clean(getattr(self, key)) for key in TEXT_FIELDS}
+            text['catatan'] = [_clean(note) for note in self.catatan]
+            self._pdf = text
+        return self._pdf
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Daftar kelas resmi (roster) + index pencarian untuk form absensi
+
+Roster di-import dari CSV/XLSX per mata kuliah ke
+DATA_DIR/roster/<slug-matkul>.json. RosterIndex dibangun sekali per versi
+file (dipakai bersama semua rerun/request di proses ini):
+
+- prefix: daftar kunci terurut (nama lengkap + tiap akhiran kata, dan
+  NPM) dengan bisect, jadi "sant" menemukan "Budi Santoso"
+- fuzzy: index trigram untuk menyaring kandidat, baru kandidat teratas
+  dinilai dengan difflib (salah ketik tetap ketemu)
+
+Check-in (form & API) dicocokkan ke entry roster yang kanonik, sehingga
+nama/NPM yang tersimpan selalu sesuai daftar kelas.
+
+    python roster.py import daftar_kelas.xlsx --matkul "Metodologi Penelitian"
+    python roster.py cari "budi sant" --matkul "Metodologi Penelitian"
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models import Mahasiswa, ValidationError, dumps, loads
+from storage import DATA_DIR, has_npm, matkul_slug, normalize_nama
+
+ROSTER_DIR = DATA_DIR / 'roster'
+
+SUGGEST_LIMIT = 8
+# Skor minimal (0-1) untuk saran fuzzy dan untuk mencocokkan check-in otomatis
+SUGGEST_MIN_SCORE = 0.6
+RESOLVE_MIN_SCORE = 0.88
+# Selisih minimal dengan kandidat kedua supaya pencocokan fuzzy tidak ambigu
+RESOLVE_MARGIN = 0.05
+FUZZY_CANDIDATES = 25
+
+_KEY_RE = re.compile(r'^[a-z0-9-]{1,60}$')
+
+NAMA_HEADERS = {'nama', 'name', 'nama mahasiswa', 'nama lengkap', 'student', 'student name'}
+NPM_HEADERS = {'npm', 'nim', 'nrp', 'nomor induk', 'student id', 'id'}
+
+
+@dataclass(frozen=True, slots=True)
+class RosterEntry:
+    nama: str
+    npm: str = '-'
+
+    def label(self) -> str:
+        return f'{self.nama} ({self.npm})' if has_npm(self.npm) else self.nama
+
+
+def _trigrams(key: str) -> set:
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class RosterIndex:
+    """Index prefix + trigram atas daftar kelas (dibangun sekali, read-only)"""
+
+    def __init__(self, entries: List[RosterEntry]):
+        self.entries = list(entries)
+        self.keys = [normalize_nama(entry.nama) for entry in self.entries]
+        self.by_npm: Dict[str, int] = {}
+        self.by_nama: Dict[str, List[int]] = {}
+        prefix, npm_prefix = [], []
+        self.trigrams: Dict[str, List[int]] = {}
+        for pos, (entry, key) in enumerate(zip(self.entries, self.keys)):
+            if has_npm(entry.npm):
+                self.by_npm.setdefault(entry.npm, pos)
+                npm_prefix.append((entry.npm, pos))
+            self.by_nama.setdefault(key, []).append(pos)
+            words = key.split()
+            for i in range(len(words)):
+                prefix.append((' '.join(words[i:]), pos))
+            for gram in _trigrams(key):
+                self.trigrams.setdefault(gram, []).append(pos)
+        prefix.sort()
+        npm_prefix.sort()
+        self._prefix_keys = [k for k, _ in prefix]
+        self._prefix_pos = [p for _, p in prefix]
+        self._npm_keys = [k for k, _ in npm_prefix]
+        self._npm_pos = [p for _, p in npm_prefix]
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _range(keys, positions, query: str):
+        """Posisi entry yang kuncinya diawali query (urut kunci)"""
+        i = bisect_left(keys, query)
+        while i < len(keys) and keys[i].startswith(query):
+            yield positions[i]
+            i += 1
+
+    def prefix(self, query: str, limit: int = SUGGEST_LIMIT) -> List[int]:
+        """Nama yang salah satu katanya diawali kata pertama query, dan kata
+        query berikutnya juga jadi awalan kata-kata setelahnya"""
+        key = normalize_nama(query)
+        if not key:
+            return []
+        words = key.split()
+        found, seen = [], set()
+        for pos in self._range(self._prefix_keys, self._prefix_pos, words[0]):
+            if pos in seen:
+                continue
+            if len(words) > 1 and not self._words_match(self.keys[pos], words):
+                continue
+            seen.add(pos)
+            found.append(pos)
+            if len(found) >= limit:
+                break
+        return found
+
+    @staticmethod
+    def _words_match(key: str, words: List[str]) -> bool:
+        names = key.split()
+        for start in range(len(names)):
+            if all(start + i < len(names) and names[start + i].startswith(word) for i, word in enumerate(words)):
+                return True
+        return False
+
+    def npm_prefix(self, query: str, limit: int = SUGGEST_LIMIT) -> List[int]:
+        return list(self._range(self._npm_keys, self._npm_pos, query.strip()))[:limit]
+
+    def fuzzy(self, query: str, limit: int = SUGGEST_LIMIT, min_score: float = SUGGEST_MIN_SCORE) -> List[tuple]:
+        """[(skor, posisi)] terbaik: kandidat dari trigram bersama, dinilai difflib"""
+        key = normalize_nama(query)
+        if not key:
+            return []
+        counts = Counter()
+        for gram in _trigrams(key):
+            counts.update(self.trigrams.get(gram, ()))
+        scored = []
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(key)
+        for pos, _ in counts.most_common(FUZZY_CANDIDATES):
+            matcher.set_seq1(self.keys[pos])
+            if matcher.real_quick_ratio() < min_score or matcher.quick_ratio() < min_score:
+                continue
+            score = matcher.ratio()
+            if score >= min_score:
+                scored.append((score, pos))
+        scored.sort(key=lambda item: (-item[0], self.keys[item[1]]))
+        return scored[:limit]
+
+    def suggest(self, query: str, limit: int = SUGGEST_LIMIT) -> List[RosterEntry]:
+        """Saran untuk autocomplete: NPM/prefix dulu, dilengkapi hasil fuzzy"""
+        query = query.strip()
+        if not query:
+            return []
+        if query.isdigit():
+            return [self.entries[pos] for pos in self.npm_prefix(query, limit)]
+        found = self.prefix(query, limit)
+        if len(found) < limit and len(query) >= 3:
+            seen = set(found)
+            found += [pos for _, pos in self.fuzzy(query, limit) if pos not in seen][:limit - len(found)]
+        return [self.entries[pos] for pos in found]
+
+    def resolve(self, nama: str, npm: str = '') -> Optional[RosterEntry]:
+        """Entry roster untuk check-in, atau None jika tidak ada / ambigu"""
+        if has_npm(npm):
+            pos = self.by_npm.get(str(npm).strip())
+            if pos is not None:
+                return self.entries[pos]
+        positions = self.by_nama.get(normalize_nama(nama), [])
+        if len(positions) == 1:
+            return self.entries[positions[0]]
+        if positions:
+            # Nama kembar di roster - harus dibedakan dengan NPM
+            return None
+        best = self.fuzzy(nama, limit=2, min_score=RESOLVE_MIN_SCORE)
+        if best and (len(best) == 1 or best[0][0] - best[1][0] >= RESOLVE_MARGIN):
+            return self.entries[best[0][1]]
+        return None
+
+    def canonical(self, mhs: Mahasiswa) -> Mahasiswa:
+        """Ganti nama/NPM check-in dengan entry roster. Raise ValidationError jika tidak cocok."""
+        entry = self.resolve(mhs.nama, mhs.npm)
+        if entry is None:
+            message = "Nama/NPM tidak ditemukan di daftar kelas"
+            saran = self.suggest(mhs.nama, limit=3)
+            if saran:
+                message += f". Maksud Anda: {', '.join(e.label() for e in saran)}?"
+            raise ValidationError(message)
+        mhs.nama, mhs.npm = entry.nama, entry.npm
+        return mhs
+
+
+# ---------- import CSV / XLSX ----------
+
+def _cell(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        # NPM dari Excel sering terbaca sebagai angka
+        value = int(value)
+    return ' '.join(str(value).split()) if value is not None else ''
+
+
+def _read_rows(content: bytes, filename: str) -> List[List[str]]:
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+
+        try:
+            workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+            try:
+                return [[_cell(value) for value in row] for row in workbook.worksheets[0].iter_rows(values_only=True)]
+            finally:
+                workbook.close()
+        except Exception as e:
+            # File rusak bisa gagal di banyak tempat (BadZipFile, KeyError part
+            # yang hilang, XML tidak valid, ...): laporkan sebagai input tidak valid
+            raise ValueError(f"File XLSX rusak atau tidak bisa dibaca ({type(e).__name__})") from e
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = content.decode('latin-1')
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    return [[_cell(value) for value in row] for row in csv.reader(io.StringIO(text), dialect)]
+
+
+def parse_roster(content: bytes, filename: str) -> List[RosterEntry]:
+    """Entry roster dari file CSV/XLSX.
+
+    Kolom dikenali dari header (nama/name, npm/nim/nrp). Tanpa header,
+    kolom yang isinya angka dianggap NPM dan kolom teks pertama nama.
+    NPM ganda hanya diambil sekali.
+    """
+    rows = [row for row in _read_rows(content, filename) if any(row)]
+    if not rows:
+        raise ValueError("File roster kosong")
+    header = [normalize_nama(value) for value in rows[0]]
+    nama_col = next((i for i, h in enumerate(header) if h in NAMA_HEADERS), None)
+    npm_col = next((i for i, h in enumerate(header) if h in NPM_HEADERS), None)
+    if nama_col is not None:
+        rows = rows[1:]
+    else:
+        sample = rows[:20]
+        width = max(len(row) for row in sample)
+        numeric = [i for i in range(width)
+                   if all(i < len(row) and row[i].isdigit() for row in sample)]
+        npm_col = numeric[0] if numeric else None
+        nama_col = next((i for i in range(width) if i not in numeric), None)
+        if nama_col is None:
+            raise ValueError("Kolom nama tidak ditemukan")
+
+    entries, seen_npm = [], set()
+    for row in rows:
+        nama = row[nama_col] if nama_col < len(row) else ''
+        npm = row[npm_col] if npm_col is not None and npm_col < len(row) else ''
+        if not nama:
+            continue
+        if has_npm(npm):
+            if npm in seen_npm:
+                continue
+            seen_npm.add(npm)
+        entries.append(RosterEntry(nama, npm if has_npm(npm) else '-'))
+    if not entries:
+        raise ValueError("Tidak ada mahasiswa di file roster")
+    return entries
+
+
+# ---------- penyimpanan ----------
+
+def roster_key(sesi: Optional[str] = None, matkul: str = '') -> Optional[str]:
+    """Slug mata kuliah untuk roster: dari ID sesi, atau dari nama matkul (sesi default)"""
+    if sesi:
+        return sesi.rsplit('_', 1)[0]
+    return matkul_slug(matkul) if str(matkul or '').strip() else None
+
+
+def _roster_path(key: str) -> Path:
+    if not _KEY_RE.match(key):
+        raise ValueError(f"Roster tidak valid: {key}")
+    return ROSTER_DIR / f'{key}.json'
+
+
+def save_roster(key: str, entries: List[RosterEntry]):
+    """Simpan roster (menggantikan yang lama, atomic)"""
+    ROSTER_DIR.mkdir(parents=True, exist_ok=True)
+    path = _roster_path(key)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(dumps([{'nama': e.nama, 'npm': e.npm} for e in entries], indent=True))
+    os.replace(tmp, path)
+
+
+def delete_roster(key: str):
+    try:
+        _roster_path(key).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def import_roster(key: str, content: bytes, filename: str) -> int:
+    """Parse + simpan roster. Return jumlah mahasiswa."""
+    entries = parse_roster(content, filename)
+    save_roster(key, entries)
+    return len(entries)
+
+
+# Index per roster, dibangun ulang hanya jika file berubah
+_index_cache: Dict[str, tuple] = {}
+
+
+def get_roster(key: Optional[str]) -> Optional[RosterIndex]:
+    """RosterIndex untuk mata kuliah, atau None jika belum ada roster"""
+    if not key:
+        return None
+    path = _roster_path(key)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    version = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _index_cache.get(key)
+    if cached is None or cached[0] != version:
+        index = RosterIndex([RosterEntry(row['nama'], row.get('npm') or '-') for row in loads(path.read_bytes())])
+        cached = _index_cache[key] = (version, index)
+    return cached[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roster (daftar kelas) untuk form absensi")
+    sub = parser.add_subparsers(dest='action', required=True)
+    imp = sub.add_parser('import', help="Import roster dari CSV/XLSX")
+    imp.add_argument('file')
+    imp.add_argument('--matkul', required=True)
+    cari = sub.add_parser('cari', help="Coba autocomplete")
+    cari.add_argument('query')
+    cari.add_argument('--matkul', required=True)
+    args = parser.parse_args()
+
+    key = roster_key(matkul=args.matkul)
+    if args.action == 'import':
+        count = import_roster(key, Path(args.file).read_bytes(), args.file)
+        print(f"✅ {count} mahasiswa di-import ke roster {key}")
+        return
+    roster = get_roster(key)
+    if roster is None:
+        raise SystemExit(f"Roster {key} belum ada")
+    start = time.perf_counter()
+    saran = roster.suggest(args.query)
+    elapsed = time.perf_counter() - start
+    for entry in saran:
+        print(f"  {entry.label()}")
+    resolved = roster.resolve(args.query)
+    print(f"-> {resolved.label() if resolved else '(tidak pasti)'}  [{elapsed * 1000:.2f} ms, {len(roster)} mahasiswa]")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,12 @@
 echo "🚀 Memulai Aplikasi Mahasiswa..."
 echo ""
 echo "✍️ Aplikasi akan berjalan di: http://localhost:8502"
+echo "⚡ API check-in ringan di: http://localhost:8503"
 echo "💡 Tekan Ctrl+C untuk menghentikan"
 echo ""
 
+python checkin_api.py &
+API_PID=$!
+trap "kill $API_PID 2>/dev/null" EXIT
+
 streamlit run mahasiswa_app.py --server.port=8502 --server.address=0.0.0.0
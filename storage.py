@@ -0,0 +1,1144 @@
+"""
+Storage layer untuk data laporan - dipakai bersama oleh app dosen & mahasiswa
+
+Backend (pilih lewat env LAPORAN_STORAGE):
+- sqlite  (default): laporan.db dalam mode WAL, aman untuk baca/tulis
+  bersamaan dari dua container.
+- journal: snapshot JSON (laporan_data.json) + journal append-only
+  (laporan_data.json.journal, satu baris JSON per perubahan).
+
+Data bisa dipartisi per sesi (matkul + tanggal): get_store(session=<id>)
+memakai DATA_DIR/sesi/<id>/, dan sesi_index.json mendaftar semua sesi.
+
+Kedua backend punya API yang sama (load, save, upsert_mahasiswa,
+upsert_many, clear_mahasiswa, reset). Check-in bersamaan sebaiknya lewat
+get_coalescer(): upsert yang datang dalam satu jendela waktu di-commit
+sebagai satu transaksi (group commit). Format JSON lama tetap bisa di-import/export:
+
+    python storage.py export laporan_data.json
+    python storage.py import laporan_data.json
+    python storage.py verify    # cek & bangun ulang ringkasan status
+"""
+
+import argparse
+import atexit
+import copy
+import fcntl
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from metrics import histogram
+from models import STATUS_LIST, Mahasiswa, copy_mahasiswa, dumps, loads
+
+DATA_DIR = Path(os.getenv('LAPORAN_DATA_DIR', '.'))
+DATA_FILE = DATA_DIR / 'laporan_data.json'
+DB_FILE = DATA_DIR / 'laporan.db'
+# Partisi per sesi (matkul + tanggal): DATA_DIR/sesi/<id>/...
+SESSIONS_DIR = DATA_DIR / 'sesi'
+SESSIONS_INDEX = DATA_DIR / 'sesi_index.json'
+# Blob gambar (tanda tangan) berbasis content hash: DATA_DIR/blobs/<sha256>
+BLOB_DIR = DATA_DIR / 'blobs'
+
+STORAGE_BACKEND = os.getenv('LAPORAN_STORAGE', 'sqlite')
+
+# fsync journal paling lambat setiap SYNC_INTERVAL detik (batching)
+SYNC_INTERVAL = float(os.getenv('LAPORAN_SYNC_INTERVAL', '0.05'))
+# Compact journal ke snapshot setelah sekian record
+COMPACT_EVERY = int(os.getenv('LAPORAN_COMPACT_EVERY', '200'))
+# Group commit: tunggu sekian milidetik untuk mengumpulkan upsert lain,
+# atau langsung commit jika sudah GROUP_COMMIT_MAX record
+GROUP_COMMIT_WINDOW = float(os.getenv('LAPORAN_GROUP_COMMIT_MS', '5')) / 1000
+GROUP_COMMIT_MAX = int(os.getenv('LAPORAN_GROUP_COMMIT_MAX', '64'))
+
+
+def normalize_nama(nama: str) -> str:
+    """Kunci nama: case-folded, spasi berlebih digabung ("  budi  SANTOSO" -> "budi santoso")"""
+    return ' '.join(str(nama).casefold().split())
+
+
+def has_npm(npm) -> bool:
+    """NPM dianggap ada jika bukan kosong/'-'"""
+    return bool(npm) and str(npm).strip() not in ('', '-')
+
+
+def mahasiswa_entry(nama: str, status: str, npm: str = '',
+                    keterangan: str = '', waktu_absen: str = '') -> Dict:
+    """Record upsert (field kosong tidak disertakan)"""
+    entry = {'nama': nama, 'status': status}
+    if npm:
+        entry['npm'] = npm
+    if keterangan:
+        entry['keterangan'] = keterangan
+    if waktu_absen:
+        entry['waktu_absen'] = waktu_absen
+    return entry
+
+
+def empty_summary() -> Dict:
+    return {'total': 0, **{status: 0 for status in STATUS_LIST}}
+
+
+def count_status(mahasiswa) -> Dict:
+    """Hitung ringkasan dari baris mentah (dipakai untuk cek konsistensi)"""
+    summary = empty_summary()
+    for mhs in mahasiswa:
+        summary['total'] += 1
+        summary[mhs['status']] = summary.get(mhs['status'], 0) + 1
+    return summary
+
+
+class MahasiswaIndex:
+    """Index posisi mahasiswa dalam list, berdasarkan NPM dan nama ternormalisasi.
+
+    NPM adalah identitas utama jika diisi. Tanpa NPM, dicocokkan dengan nama;
+    entry lama yang punya NPM berbeda tidak dianggap orang yang sama.
+    """
+
+    def __init__(self, mahasiswa=()):
+        self.by_npm = {}
+        self.by_nama = {}
+        # Ringkasan per status, diperbarui bersamaan dengan index
+        self.summary = empty_summary()
+        for pos, mhs in enumerate(mahasiswa):
+            self.add(pos, mhs)
+            self.count(mhs['status'], 1)
+
+    def count(self, status: str, delta: int):
+        self.summary[status] = self.summary.get(status, 0) + delta
+        self.summary['total'] += delta
+
+    def add(self, pos: int, mhs: Mahasiswa):
+        if has_npm(mhs.get('npm')):
+            self.by_npm.setdefault(str(mhs['npm']).strip(), pos)
+        self.by_nama.setdefault(normalize_nama(mhs['nama']), pos)
+
+    def find(self, mahasiswa, nama: str, npm: str = ''):
+        """Posisi mahasiswa yang cocok, atau None"""
+        if has_npm(npm):
+            pos = self.by_npm.get(str(npm).strip())
+            if pos is not None:
+                return pos
+        pos = self.by_nama.get(normalize_nama(nama))
+        if pos is not None and has_npm(npm) and has_npm(mahasiswa[pos].get('npm')):
+            # Nama sama tapi NPM beda - mahasiswa lain
+            return None
+        return pos
+
+
+def _apply(state: Dict, record: Dict, index: MahasiswaIndex):
+    """Terapkan satu record journal ke state (idempotent jika di-replay ulang)"""
+    op = record.get('op')
+    if op == 'upsert':
+        _merge_mahasiswa(state.setdefault('mahasiswa', []), index, record['mhs'])
+    elif op == 'set':
+        for key, value in record['fields'].items():
+            if key != 'mahasiswa':
+                state[key] = value
+    elif op == 'clear':
+        state['mahasiswa'] = []
+        index.__init__()
+
+
+def _merge_mahasiswa(mahasiswa, index: MahasiswaIndex, entry: Dict) -> bool:
+    """Update mahasiswa yang sama (NPM/nama), atau tambah baru. True jika update.
+
+    Baris disimpan dalam format tersimpan (dict, lihat Mahasiswa.to_dict), sama
+    seperti baris dari snapshot; load() yang membuat Mahasiswa.
+    """
+    pos = index.find(mahasiswa, entry['nama'], entry.get('npm', ''))
+
+    if pos is not None:
+        existing = mahasiswa[pos]
+        if existing['status'] != entry['status']:
+            index.count(existing['status'], -1)
+            index.count(entry['status'], 1)
+        existing['status'] = entry['status']
+        for key in ('npm', 'keterangan', 'waktu_absen'):
+            if entry.get(key):
+                existing[key] = entry[key]
+        index.add(pos, existing)
+        return True
+
+    new_entry = Mahasiswa.from_dict(entry).to_dict()
+    mahasiswa.append(new_entry)
+    index.add(len(mahasiswa) - 1, new_entry)
+    index.count(new_entry['status'], 1)
+    return False
+
+
+class CachedLoadMixin:
+    """load_cached(): hasil load() dipakai bersama selama revisi store belum berubah.
+
+    Cek revisi murah (stat file / satu baris SQL), jadi banyak sesi Streamlit
+    yang rerun tidak memicu parse ulang seluruh data. Subclass mengisi
+    self._cached dan self._cached_lock di __init__ (per instance, supaya
+    store yang berbeda tidak saling menunggu).
+    """
+
+    def load_cached(self) -> Dict:
+        """Seperti load(), tapi jangan dimodifikasi - objek dipakai bersama antar sesi"""
+        revision = self.revision()
+        cached = self._cached
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        with self._cached_lock:
+            cached = self._cached
+            if cached is not None and cached[0] == revision:
+                return cached[1]
+            # Revisi dibaca sebelum load: paling buruk load ulang sekali lagi, tidak pernah basi
+            data = self.load()
+            self._cached = (revision, data)
+            return data
+
+
+class JournalStore(CachedLoadMixin):
+    """Snapshot JSON + journal append-only.
+
+    Antar proses (container dosen & mahasiswa) dikoordinasi dengan flock:
+    append/read memakai shared lock, compaction memakai exclusive lock.
+    Antar thread dalam satu proses dikoordinasi dengan mutex.
+    """
+
+    def __init__(self, path=None, sync_interval: float = SYNC_INTERVAL,
+                 compact_every: int = COMPACT_EVERY):
+        self.path = Path(path) if path else DATA_FILE
+        self.journal_path = self.path.with_name(self.path.name + '.journal')
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._mutex = threading.RLock()
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._journal_fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        self._cached = None
+        self._cached_lock = threading.Lock()
+
+        self._state = {}
+        self._index = MahasiswaIndex()
+        self._snapshot_id = None
+        self._offset = 0
+        self._records = 0
+        self._dirty = False
+        self._closed = False
+
+        self._flusher = threading.Thread(target=self._background, name='journal-flusher', daemon=True)
+        self._flusher.start()
+
+    # ---------- locking ----------
+
+    def _flock(self, exclusive=False):
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _funlock(self):
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # ---------- replay ----------
+
+    def _stat_snapshot(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        """Sinkronkan state memori dengan disk: snapshot (jika berubah) + tail journal"""
+        snapshot_id = self._stat_snapshot()
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            journal_size = 0
+
+        if snapshot_id != self._snapshot_id or journal_size < self._offset:
+            # Snapshot baru (compaction/reset oleh proses lain) - baca ulang penuh
+            self._state = {}
+            if snapshot_id is not None:
+                with open(self.path, 'rb') as f:
+                    self._state = loads(f.read())
+            # Baris tetap dict (snapshot dan journal sama); Mahasiswa baru
+            # dibuat saat disalin keluar oleh load()
+            self._state['mahasiswa'] = self._state.get('mahasiswa') or []
+            self._index = MahasiswaIndex(self._state['mahasiswa'])
+            self._snapshot_id = snapshot_id
+            self._offset = 0
+            self._records = 0
+
+        if journal_size > self._offset:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._offset)
+                tail = f.read(journal_size - self._offset)
+            # Hanya proses baris yang lengkap
+            end = tail.rfind(b'\n') + 1
+            for line in tail[:end].splitlines():
+                if line.strip():
+                    _apply(self._state, loads(line), self._index)
+                    self._records += 1
+            self._offset += end
+
+        self._state.setdefault('mahasiswa', [])
+
+    def _append(self, record: Dict):
+        with self._mutex:
+            self._flock()
+            try:
+                self._append_locked(record)
+            finally:
+                self._funlock()
+
+    def _append_locked(self, record: Dict):
+        """Append satu record; pemanggil sudah memegang mutex + flock"""
+        line = dumps(record) + b'\n'
+        os.write(self._journal_fd, line)
+        self._dirty = True
+        self._refresh()
+
+    # ---------- public API ----------
+
+    def load(self) -> Dict:
+        """Snapshot + tail journal sebagai dict (copy, aman dimodifikasi)"""
+        with self._mutex:
+            self._flock()
+            try:
+                self._refresh()
+                data = {k: copy.deepcopy(v) for k, v in self._state.items() if k != 'mahasiswa'}
+                data['mahasiswa'] = [copy_mahasiswa(mhs) for mhs in self._state['mahasiswa']]
+                return data
+            finally:
+                self._funlock()
+
+    def revision(self):
+        """Versi data di disk (snapshot + ukuran journal), tanpa membaca isinya"""
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            journal_size = 0
+        return self._stat_snapshot(), journal_size
+
+    def upsert_mahasiswa(self, nama: str, status: str, npm: str = '',
+                         keterangan: str = '', waktu_absen: str = '') -> bool:
+        """Tambah/update absensi satu mahasiswa. True jika data lama diperbarui."""
+        entry = mahasiswa_entry(nama, status, npm, keterangan, waktu_absen)
+
+        with self._mutex:
+            self._flock()
+            try:
+                self._refresh()
+                updated = self._index.find(self._state['mahasiswa'], nama, npm) is not None
+            finally:
+                self._funlock()
+            self._append({'op': 'upsert', 'mhs': entry})
+        return updated
+
+    def upsert_many(self, entries: List[Dict]) -> List[bool]:
+        """Upsert beberapa record (lihat mahasiswa_entry) dengan satu lock dan
+        satu fsync. Kembali setelah semua record durable; list flag 'updated'."""
+        results = []
+        with self._mutex:
+            self._flock()
+            try:
+                self._refresh()
+                for entry in entries:
+                    entry = mahasiswa_entry(**entry)
+                    results.append(self._index.find(self._state['mahasiswa'], entry['nama'],
+                                                    entry.get('npm', '')) is not None)
+                    self._append_locked({'op': 'upsert', 'mhs': entry})
+            finally:
+                self._funlock()
+            self.flush()
+        return results
+
+    def summary(self) -> Dict:
+        """Ringkasan per status (O(1), dipelihara saat upsert)"""
+        with self._mutex:
+            self._flock()
+            try:
+                self._refresh()
+                return dict(self._index.summary)
+            finally:
+                self._funlock()
+
+    def get_meta(self, key: str, default=None):
+        """Satu field laporan (mis. 'matkul') tanpa menyalin daftar mahasiswa"""
+        with self._mutex:
+            self._flock()
+            try:
+                self._refresh()
+                return copy.deepcopy(self._state.get(key, default))
+            finally:
+                self._funlock()
+
+    def verify_summary(self, repair: bool = True) -> bool:
+        """Bandingkan ringkasan dengan hitungan ulang dari baris mentah.
+        True jika konsisten; jika tidak dan repair=True, ringkasan dibangun ulang."""
+        with self._mutex:
+            self._flock()
+            try:
+                self._refresh()
+                expected = count_status(self._state['mahasiswa'])
+                ok = {k: v for k, v in self._index.summary.items() if v} == {k: v for k, v in expected.items() if v}
+                if not ok and repair:
+                    self._index = MahasiswaIndex(self._state['mahasiswa'])
+                return ok
+            finally:
+                self._funlock()
+
+    def save(self, data: Dict):
+        """Simpan field laporan (tanpa daftar mahasiswa, yang dikelola lewat upsert)"""
+        fields = {k: v for k, v in data.items() if k != 'mahasiswa'}
+        self._append({'op': 'set', 'fields': fields})
+
+    def clear_mahasiswa(self):
+        """Hapus semua data absensi"""
+        self._append({'op': 'clear'})
+
+    def reset(self):
+        """Hapus semua data (snapshot + journal)"""
+        with self._mutex:
+            self._flock(exclusive=True)
+            try:
+                self._write_snapshot({'mahasiswa': []})
+                os.ftruncate(self._journal_fd, 0)
+                os.fsync(self._journal_fd)
+                self._snapshot_id = None
+                self._refresh()
+            finally:
+                self._funlock()
+
+    def flush(self):
+        """fsync journal jika ada perubahan yang belum durable"""
+        with self._mutex:
+            if self._dirty:
+                os.fsync(self._journal_fd)
+                self._dirty = False
+
+    def compact(self):
+        """Tulis state ke snapshot baru dan kosongkan journal"""
+        with self._mutex:
+            self._flock(exclusive=True)
+            try:
+                self._refresh()
+                self._write_snapshot(self._state)
+                os.ftruncate(self._journal_fd, 0)
+                os.fsync(self._journal_fd)
+                self._dirty = False
+                self._snapshot_id = self._stat_snapshot()
+                self._offset = 0
+                self._records = 0
+            finally:
+                self._funlock()
+
+    def close(self):
+        with self._mutex:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            os.close(self._journal_fd)
+            os.close(self._lock_fd)
+
+    # ---------- internal ----------
+
+    def _write_snapshot(self, state: Dict):
+        """Atomic write: temp file + fsync + rename"""
+        tmp = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(dumps(state, indent=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _background(self):
+        """fsync batching + compaction di background"""
+        while not self._closed:
+            time.sleep(self.sync_interval)
+            if self._closed:
+                break
+            try:
+                self.flush()
+                if self._records >= self.compact_every:
+                    self.compact()
+            except Exception as e:
+                print(f"Journal background error: {e}")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sesi (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS kehadiran (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama TEXT NOT NULL,
+    nama_key TEXT NOT NULL DEFAULT '',
+    npm TEXT NOT NULL DEFAULT '-',
+    status TEXT NOT NULL,
+    keterangan TEXT,
+    waktu_absen TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_kehadiran_npm ON kehadiran (npm);
+CREATE TABLE IF NOT EXISTS ringkasan (
+    status TEXT PRIMARY KEY,
+    jumlah INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS catatan (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    isi TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisi (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    nomor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO revisi (id, nomor) VALUES (1, 0);
+"""
+
+
+class _Connection(sqlite3.Connection):
+    """sqlite3.Connection yang bisa di-weakref (untuk SQLiteStore.close)"""
+
+
+class SQLiteStore(CachedLoadMixin):
+    """Backend SQLite (WAL).
+
+    Satu koneksi per thread (Streamlit menjalankan tiap rerun di thread
+    ScriptRunner baru). Koneksi hanya dipegang threading.local, jadi ikut
+    tertutup saat thread-nya selesai; close() menutup yang masih hidup.
+    WAL membuat pembaca tidak memblokir penulis; penulis antar container
+    diserialkan oleh SQLite dengan busy_timeout.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DB_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # Referensi lemah: tidak menahan koneksi thread yang sudah selesai
+        self._conns = weakref.WeakSet()
+        self._conns_lock = threading.Lock()
+        self._cached = None
+        self._cached_lock = threading.Lock()
+
+        is_new = not self.path.exists()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+
+        # Migrasi sekali dari file JSON lama (tanda tangan base64 dipindah ke blob)
+        legacy = self.path.with_name(DATA_FILE.name)
+        if is_new and legacy.exists():
+            import_json(self, legacy)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False, factory=_Connection)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.add(conn)
+        return conn
+
+    def _migrate(self, conn):
+        """Tambah kolom nama_key (kunci nama ternormalisasi) pada database lama"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(kehadiran)')}
+        with self._write() as conn:
+            if 'nama_key' not in columns:
+                conn.execute("ALTER TABLE kehadiran ADD COLUMN nama_key TEXT NOT NULL DEFAULT ''")
+            conn.executemany(
+                'UPDATE kehadiran SET nama_key = ? WHERE id = ?',
+                [(normalize_nama(row['nama']), row['id'])
+                 for row in conn.execute("SELECT id, nama FROM kehadiran WHERE nama_key = ''")]
+            )
+            if columns and not conn.execute('SELECT 1 FROM ringkasan LIMIT 1').fetchone():
+                _rebuild_summary(conn)
+            conn.execute('DROP INDEX IF EXISTS idx_kehadiran_nama')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_kehadiran_nama_key ON kehadiran (nama_key)')
+
+    def _find_mahasiswa(self, conn, nama: str, npm: str = ''):
+        """id mahasiswa yang sama (NPM sebagai identitas utama, lalu nama), atau None"""
+        if has_npm(npm):
+            row = conn.execute('SELECT id FROM kehadiran WHERE npm = ? ORDER BY id LIMIT 1',
+                               (str(npm).strip(),)).fetchone()
+            if row:
+                return row['id']
+            row = conn.execute(
+                "SELECT id FROM kehadiran WHERE nama_key = ? AND npm = '-' ORDER BY id LIMIT 1",
+                (normalize_nama(nama),)
+            ).fetchone()
+        else:
+            row = conn.execute('SELECT id FROM kehadiran WHERE nama_key = ? ORDER BY id LIMIT 1',
+                               (normalize_nama(nama),)).fetchone()
+        return row['id'] if row else None
+
+    def _write(self):
+        """Transaksi tulis (BEGIN IMMEDIATE supaya lock diambil di awal)"""
+        return _Transaction(self._conn())
+
+    # ---------- public API ----------
+
+    def load(self) -> Dict:
+        """Semua data laporan sebagai dict (format sama dengan JSON lama)"""
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            data = {row['key']: loads(row['value'])
+                    for row in conn.execute('SELECT key, value FROM sesi')}
+            data['mahasiswa'] = [
+                Mahasiswa(*row) for row in conn.execute(
+                    "SELECT nama, npm, status, COALESCE(keterangan, ''), COALESCE(waktu_absen, '') "
+                    "FROM kehadiran ORDER BY id")
+            ]
+            data['catatan'] = [row['isi'] for row in conn.execute('SELECT isi FROM catatan ORDER BY id')]
+        finally:
+            conn.execute('COMMIT')
+        return data
+
+    def upsert_mahasiswa(self, nama: str, status: str, npm: str = '',
+                         keterangan: str = '', waktu_absen: str = '') -> bool:
+        """Tambah/update absensi satu mahasiswa. True jika data lama diperbarui."""
+        with self._write() as conn:
+            return self._upsert(conn, nama, status, npm, keterangan, waktu_absen)
+
+    def upsert_many(self, entries: List[Dict]) -> List[bool]:
+        """Upsert beberapa record (lihat mahasiswa_entry) dalam satu transaksi.
+        Commit di-fsync (synchronous=FULL) sebelum kembali; list flag 'updated'."""
+        conn = self._conn()
+        conn.execute('PRAGMA synchronous=FULL')
+        try:
+            with self._write() as conn:
+                return [self._upsert(conn, **entry) for entry in entries]
+        finally:
+            conn.execute('PRAGMA synchronous=NORMAL')
+
+    def _upsert(self, conn, nama: str, status: str, npm: str = '',
+                keterangan: str = '', waktu_absen: str = '') -> bool:
+        mhs_id = self._find_mahasiswa(conn, nama, npm)
+        if mhs_id is not None:
+            old_status = conn.execute('SELECT status FROM kehadiran WHERE id = ?', (mhs_id,)).fetchone()['status']
+            if old_status != status:
+                _count(conn, old_status, -1)
+                _count(conn, status, 1)
+            conn.execute(
+                'UPDATE kehadiran SET status = ?, '
+                'npm = COALESCE(?, npm), keterangan = COALESCE(?, keterangan), '
+                'waktu_absen = COALESCE(?, waktu_absen) WHERE id = ?',
+                (status, npm or None, keterangan or None, waktu_absen or None, mhs_id)
+            )
+            return True
+        conn.execute(
+            'INSERT INTO kehadiran (nama, nama_key, npm, status, keterangan, waktu_absen) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (nama, normalize_nama(nama), npm or '-', status, keterangan or None, waktu_absen or None)
+        )
+        _count(conn, status, 1)
+        return False
+
+    def revision(self) -> int:
+        """Nomor revisi, naik setiap transaksi tulis (dari proses mana pun)"""
+        return self._conn().execute('SELECT nomor FROM revisi WHERE id = 1').fetchone()['nomor']
+
+    def summary(self) -> Dict:
+        """Ringkasan per status (O(1), dipelihara saat upsert)"""
+        summary = empty_summary()
+        for row in self._conn().execute('SELECT status, jumlah FROM ringkasan'):
+            summary[row['status']] = row['jumlah']
+            summary['total'] += row['jumlah']
+        return summary
+
+    def get_meta(self, key: str, default=None):
+        """Satu field laporan (mis. 'matkul') tanpa membaca daftar mahasiswa"""
+        row = self._conn().execute('SELECT value FROM sesi WHERE key = ?', (key,)).fetchone()
+        return loads(row['value']) if row else default
+
+    def verify_summary(self, repair: bool = True) -> bool:
+        """Bandingkan tabel ringkasan dengan hitungan ulang dari baris kehadiran.
+        True jika konsisten; jika tidak dan repair=True, ringkasan dibangun ulang."""
+        with self._write() as conn:
+            stored = {row['status']: row['jumlah'] for row in conn.execute('SELECT status, jumlah FROM ringkasan') if row['jumlah']}
+            actual = {row['status']: row['jumlah'] for row in
+                      conn.execute('SELECT status, COUNT(*) AS jumlah FROM kehadiran GROUP BY status')}
+            ok = stored == actual
+            if not ok and repair:
+                _rebuild_summary(conn)
+            return ok
+
+    def save(self, data: Dict):
+        """Simpan field laporan + catatan (absensi dikelola lewat upsert)"""
+        with self._write() as conn:
+            _save_fields(conn, data)
+
+    def clear_mahasiswa(self):
+        """Hapus semua data absensi"""
+        with self._write() as conn:
+            conn.execute('DELETE FROM kehadiran')
+            conn.execute('DELETE FROM ringkasan')
+
+    def reset(self):
+        """Hapus semua data"""
+        with self._write() as conn:
+            conn.execute('DELETE FROM sesi')
+            conn.execute('DELETE FROM kehadiran')
+            conn.execute('DELETE FROM ringkasan')
+            conn.execute('DELETE FROM catatan')
+
+    def import_data(self, data: Dict):
+        """Ganti seluruh isi database dengan data format JSON"""
+        with self._write() as conn:
+            conn.execute('DELETE FROM sesi')
+            conn.execute('DELETE FROM kehadiran')
+            conn.execute('DELETE FROM ringkasan')
+            conn.execute('DELETE FROM catatan')
+            _save_fields(conn, data)
+            conn.executemany(
+                'INSERT INTO kehadiran (nama, nama_key, npm, status, keterangan, waktu_absen) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(m['nama'], normalize_nama(m['nama']), m.get('npm') or '-', m['status'], m.get('keterangan'), m.get('waktu_absen'))
+                 for m in data.get('mahasiswa', [])]
+            )
+            _rebuild_summary(conn)
+
+    def close(self):
+        with self._conns_lock:
+            for conn in list(self._conns):
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conns = weakref.WeakSet()
+        self._local = threading.local()
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.conn.execute('ROLLBACK')
+        else:
+            self.conn.execute('UPDATE revisi SET nomor = nomor + 1 WHERE id = 1')
+            self.conn.execute('COMMIT')
+        return False
+
+
+def _count(conn, status: str, delta: int):
+    conn.execute(
+        'INSERT INTO ringkasan (status, jumlah) VALUES (?, ?) '
+        'ON CONFLICT(status) DO UPDATE SET jumlah = jumlah + excluded.jumlah',
+        (status, delta)
+    )
+
+
+def _rebuild_summary(conn):
+    """Bangun ulang tabel ringkasan dari baris kehadiran"""
+    conn.execute('DELETE FROM ringkasan')
+    conn.execute('INSERT INTO ringkasan (status, jumlah) SELECT status, COUNT(*) FROM kehadiran GROUP BY status')
+
+
+def _save_fields(conn, data: Dict):
+    fields = [(k, dumps(v).decode('utf-8')) for k, v in data.items()
+              if k not in ('mahasiswa', 'catatan')]
+    conn.executemany('INSERT OR REPLACE INTO sesi (key, value) VALUES (?, ?)', fields)
+    if 'catatan' in data:
+        conn.execute('DELETE FROM catatan')
+        conn.executemany('INSERT INTO catatan (isi) VALUES (?)',
+                         [(str(note),) for note in data['catatan']])
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=None, backend: str = None, session: Optional[str] = None, create: bool = True):
+    """Store per file data (satu instance per proses).
+
+    Dengan session=<id>, store untuk partisi sesi tersebut; tanpa session,
+    store default (satu sesi, seperti sebelumnya). Pembaca (app mahasiswa,
+    API check-in) memakai create=False: sesi harus sudah didaftarkan app
+    dosen lewat create_session(), ID lain ditolak (ValueError) tanpa
+    membuat partisi baru.
+    """
+    backend = backend or STORAGE_BACKEND
+    if backend == 'journal':
+        cls, default = JournalStore, DATA_FILE
+    elif backend == 'sqlite':
+        cls, default = SQLiteStore, DB_FILE
+    else:
+        raise ValueError(f"Backend storage tidak dikenal: {backend}")
+
+    check_index = False
+    if path:
+        path = Path(path)
+    elif session:
+        path = SESSIONS_DIR / _check_session_id(session) / default.name
+        check_index = not create
+    else:
+        path = default
+
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            if check_index and not session_exists(session):
+                raise ValueError(f"Sesi tidak ditemukan: {session}")
+            store = _stores[path] = cls(path)
+        return store
+
+
+
+# ---------- group commit ----------
+
+# Batas atas bucket histogram ukuran batch (record per commit)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+BATCH_SIZE_HIST = histogram('laporan_group_commit_batch_size', 'Record per group commit', BATCH_BUCKETS)
+COMMIT_SECONDS_HIST = histogram('laporan_group_commit_seconds', 'Durasi commit satu batch (detik)')
+ACK_SECONDS_HIST = histogram('laporan_group_commit_ack_seconds', 'Submit sampai batch durable, record terlama (detik)')
+
+
+class WriteCoalescer:
+    """Group commit untuk upsert absensi.
+
+    Upsert dari banyak thread/request dikumpulkan selama `window` detik
+    sejak record pertama (atau sampai `max_batch` record), lalu di-commit
+    lewat store.upsert_many() dalam satu transaksi. Pengirim baru mendapat
+    hasil setelah batch-nya durable.
+    """
+
+    def __init__(self, store, window: float = GROUP_COMMIT_WINDOW, max_batch: int = GROUP_COMMIT_MAX):
+        self.store = store
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._queue = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._batches = 0
+        self._records = 0
+        self._max_batch_seen = 0
+        self._batch_hist = {bound: 0 for bound in BATCH_BUCKETS}
+        self._commit_total = 0.0
+        self._commit_max = 0.0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._errors = 0
+
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+
+    def submit(self, nama: str, status: str, npm: str = '',
+               keterangan: str = '', waktu_absen: str = '') -> Future:
+        """Antrikan satu upsert. Future berisi flag 'updated' setelah commit."""
+        future = Future()
+        entry = mahasiswa_entry(nama, status, npm, keterangan, waktu_absen)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Coalescer sudah ditutup")
+            self._queue.append((entry, future, time.monotonic()))
+            self._cond.notify()
+        return future
+
+    def upsert_mahasiswa(self, nama: str, status: str, npm: str = '',
+                         keterangan: str = '', waktu_absen: str = '') -> bool:
+        """Seperti store.upsert_mahasiswa, tapi ikut group commit (blocking)"""
+        return self.submit(nama, status, npm, keterangan, waktu_absen).result()
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            deadline = self._queue[0][2] + self.window
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._queue[:self.max_batch]
+            del self._queue[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            # Submit yang sudah dibatalkan (mis. client putus) tidak ditulis
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            start = time.monotonic()
+            try:
+                results = self.store.upsert_many([entry for entry, _, _ in batch])
+            except Exception as e:
+                self._errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.monotonic()
+            for (_, future, _), updated in zip(batch, results):
+                future.set_result(updated)
+            self._record(len(batch), done - start, max(done - queued for _, _, queued in batch))
+
+    def _record(self, size: int, commit: float, wait: float):
+        BATCH_SIZE_HIST.observe(size)
+        COMMIT_SECONDS_HIST.observe(commit)
+        ACK_SECONDS_HIST.observe(wait)
+        with self._cond:
+            self._batches += 1
+            self._records += size
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            for bound in BATCH_BUCKETS:
+                if size <= bound:
+                    self._batch_hist[bound] += 1
+                    break
+            self._commit_total += commit
+            self._commit_max = max(self._commit_max, commit)
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def stats(self) -> Dict:
+        """Metrik: jumlah batch/record, histogram ukuran batch (kumulatif, seperti
+        bucket Prometheus 'le'), latensi commit dan latensi submit->ack (ms)"""
+        with self._cond:
+            batches = self._batches or 1
+            cumulative, hist = 0, {}
+            for bound in BATCH_BUCKETS:
+                cumulative += self._batch_hist[bound]
+                hist[str(bound)] = cumulative
+            hist['+Inf'] = self._batches
+            return {
+                'batches': self._batches,
+                'records': self._records,
+                'errors': self._errors,
+                'pending': len(self._queue),
+                'avg_batch': self._records / batches,
+                'max_batch': self._max_batch_seen,
+                'batch_size_hist': hist,
+                'commit_ms_avg': self._commit_total / batches * 1000,
+                'commit_ms_max': self._commit_max * 1000,
+                'ack_ms_avg': self._wait_total / batches * 1000,
+                'ack_ms_max': self._wait_max * 1000,
+            }
+
+    def close(self):
+        """Commit sisa antrian lalu hentikan thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+_coalescers = {}
+
+
+def get_coalescer(path=None, backend: str = None, session: Optional[str] = None,
+                  create: bool = True) -> WriteCoalescer:
+    """Group-commit writer untuk store yang sama dengan get_store(...)"""
+    store = get_store(path, backend, session, create)
+    with _stores_lock:
+        coalescer = _coalescers.get(id(store))
+        if coalescer is None:
+            coalescer = _coalescers[id(store)] = WriteCoalescer(store)
+        return coalescer
+
+
+# ---------- index sesi ----------
+
+_SESSION_ID_RE = re.compile(r'^[a-z0-9-]+_\d{4}-\d{2}-\d{2}$')
+_index_cache = (None, [])
+
+
+def _check_session_id(session: str) -> str:
+    if not isinstance(session, str) or not _SESSION_ID_RE.match(session):
+        raise ValueError(f"ID sesi tidak valid: {session}")
+    return session
+
+
+def matkul_slug(matkul: str) -> str:
+    """Slug mata kuliah, mis. 'metodologi-penelitian' (bagian depan ID sesi)"""
+    return (re.sub(r'[^a-z0-9]+', '-', normalize_nama(matkul)).strip('-') or 'kuliah')[:60]
+
+
+def session_id(matkul: str, tanggal: Union[date, str]) -> str:
+    """ID sesi dari mata kuliah + tanggal, mis. 'metodologi-penelitian_2025-05-12'"""
+    if isinstance(tanggal, (date, datetime)):
+        tanggal = tanggal.strftime('%Y-%m-%d')
+    return _check_session_id(f'{matkul_slug(matkul)}_{tanggal}')
+
+
+def list_sessions() -> List[Dict]:
+    """Daftar sesi dari file index (terbaru dulu); dibaca ulang hanya jika file berubah"""
+    global _index_cache
+    try:
+        st = os.stat(SESSIONS_INDEX)
+    except FileNotFoundError:
+        return []
+    version = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _index_cache[0] != version:
+        with open(SESSIONS_INDEX, 'r') as f:
+            sessions = json.load(f).get('sessions', [])
+        sessions.sort(key=lambda sesi: (sesi['tanggal'], sesi['id']), reverse=True)
+        _index_cache = (version, sessions)
+    return _index_cache[1]
+
+
+def session_exists(session: str) -> bool:
+    """True jika ID sesi terdaftar di index"""
+    return any(sesi['id'] == session for sesi in list_sessions())
+
+
+def create_session(matkul: str, tanggal: Union[date, str]) -> str:
+    """Daftarkan sesi baru di index (idempotent). Return ID sesi."""
+    sid = session_id(matkul, tanggal)
+    SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    lock_path = SESSIONS_INDEX.with_name(SESSIONS_INDEX.name + '.lock')
+    with open(lock_path, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(SESSIONS_INDEX, 'r') as f:
+                    index = json.load(f)
+            except FileNotFoundError:
+                index = {'sessions': []}
+            if not any(sesi['id'] == sid for sesi in index['sessions']):
+                index['sessions'].append({
+                    'id': sid,
+                    'matkul': matkul,
+                    'tanggal': sid.rsplit('_', 1)[1],
+                    'dibuat': datetime.now().isoformat(timespec='seconds'),
+                })
+                tmp = SESSIONS_INDEX.with_name(f'.{SESSIONS_INDEX.name}.{os.getpid()}.tmp')
+                with open(tmp, 'w') as f:
+                    json.dump(index, f, indent=2, ensure_ascii=False)
+                os.replace(tmp, SESSIONS_INDEX)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return sid
+
+
+# ---------- blob ----------
+
+_BLOB_ID_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def put_blob(content: bytes) -> str:
+    """Simpan blob (deduplikasi otomatis lewat sha256). Return ID blob."""
+    blob_id = hashlib.sha256(content).hexdigest()
+    path = BLOB_DIR / blob_id
+    if not path.exists():
+        BLOB_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{blob_id}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    return blob_id
+
+
+def get_blob(blob_id: str) -> Optional[bytes]:
+    """Isi blob, atau None jika tidak ada"""
+    if not blob_id or not _BLOB_ID_RE.match(blob_id):
+        return None
+    try:
+        with open(BLOB_DIR / blob_id, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def export_json(store, path):
+    """Export isi store ke file JSON format lama (atomic write)"""
+    import base64
+
+    data = store.load()
+    data['mahasiswa'] = [mhs.to_dict() for mhs in data['mahasiswa']]
+    # Format lama: tanda tangan sebagai base64 di dalam JSON
+    blob = get_blob(data.pop('signature_ref', None))
+    if blob:
+        data['signature'] = base64.b64encode(blob).decode()
+
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def import_json(store, path):
+    """Import file JSON format lama ke store (mengganti isi store)"""
+    import base64
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data.get('signature'), str):
+        # Tanda tangan base64 lama dipindah ke blob
+        data['signature_ref'] = put_blob(base64.b64decode(data['signature']))
+        data['signature'] = None
+    if hasattr(store, 'import_data'):
+        store.import_data(data)
+    else:
+        store.reset()
+        store.save(data)
+        for m in data.get('mahasiswa', []):
+            store.upsert_mahasiswa(m['nama'], m['status'], m.get('npm', ''),
+                                   m.get('keterangan', ''), m.get('waktu_absen', ''))
+
+
+@atexit.register
+def _close_stores():
+    for coalescer in list(_coalescers.values()):
+        try:
+            coalescer.close()
+        except Exception:
+            pass
+    for store in list(_stores.values()):
+        try:
+            store.close()
+        except Exception:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import/export data laporan (format JSON), cek ringkasan")
+    parser.add_argument('action', choices=['import', 'export', 'verify'])
+    parser.add_argument('file', nargs='?', help="File JSON (untuk import/export)")
+    parser.add_argument('--backend', choices=['sqlite', 'journal'], default=None)
+    parser.add_argument('--sesi', default=None, help="ID sesi (default: store tanpa sesi)")
+    args = parser.parse_args()
+
+    store = get_store(backend=args.backend, session=args.sesi)
+    if args.action == 'verify':
+        ok = store.verify_summary(repair=True)
+        print("✅ Ringkasan konsisten" if ok else "⚠️ Ringkasan tidak konsisten - sudah dibangun ulang")
+        print(store.summary())
+        return
+    if not args.file:
+        parser.error("file harus diisi untuk import/export")
+    if args.action == 'export':
+        export_json(store, args.file)
+    else:
+        import_json(store, args.file)
+    print(f"✅ {args.action} {args.file} selesai")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,26 @@ Semua dalam 1 halaman, mobile-friendly
 """
 
 import os
-import json
-import tempfile
+import time
 import streamlit as st
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
-import base64
-from io import BytesIO
 
 from utils_simple import (
-    validate_laporan_data,
-    generate_simple_pdf
+    encode_signature,
+    photo_pixels,
+    generate_pdf_cached,
+    generate_rekap_pdf,
+    get_pdf_cache,
+    get_photo_cache
 )
+from archive import get_archive
+from cache import stable_hash
+from metrics import profile, span, start_file_export, timed
+from models import STATUS_LIST, TEXT_FIELDS, Laporan
+from roster import delete_roster, get_roster, import_roster, roster_key
+from jobs import ANTRI, SELESAI, QueueFull, get_queue
+from storage import create_session, get_store, list_sessions, put_blob
 
 # Configure
 st.set_page_config(
@@ -26,22 +33,89 @@ st.set_page_config(
     layout="wide"
 )
 
-# Data files
-DATA_FILE = Path('laporan_data.json')
 OUTPUT_DIR = Path('laporan_output')
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
+STATUS_OPTIONS = STATUS_LIST
+SORT_COLUMNS = {"Urutan absen": None, "Nama": 'Nama', "NPM": 'NPM', "Status": 'Status'}
+PAGE_SIZE = 50
+LIVE_INTERVAL = int(os.getenv('LAPORAN_LIVE_INTERVAL', '5'))
+
+# st.fragment (auto-poll) tersedia di Streamlit baru; versi lama tanpa mode live
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+
+@st.cache_resource
+def _frame_cache():
+    """{sesi: (list mahasiswa, DataFrame)} - bertahan antar rerun (script ini di-exec ulang setiap rerun)"""
+    return {}
+
+
+def mahasiswa_frame(sesi, mahasiswa):
+    """Daftar mahasiswa sebagai DataFrame untuk tabel.
+
+    Dibangun ulang hanya jika list dari load_cached() berganti (revisi store berubah).
+    """
+    cache = _frame_cache()
+    cached = cache.get(sesi)
+    if cached is not None and cached[0] is mahasiswa:
+        return cached[1]
+    import pandas as pd
+    
+    df = pd.DataFrame.from_records(
+        [(mhs.nama, mhs.npm, mhs.status, mhs.waktu_absen, mhs.keterangan) for mhs in mahasiswa],
+        columns=['Nama', 'NPM', 'Status', 'Waktu Absen', 'Keterangan']
+    )
+    df.insert(0, 'No', range(1, len(df) + 1))
+    cache[sesi] = (mahasiswa, df)
+    return df
+
+
+def current_store():
+    """Store untuk sesi yang dipilih - dipakai bersama dengan aplikasi mahasiswa"""
+    return get_store(session=st.session_state.get('sesi'))
+
+
+def format_sesi(sesi_id):
+    if sesi_id is None:
+        return "Sesi default"
+    sesi = next((s for s in list_sessions() if s['id'] == sesi_id), None)
+    return f"{sesi['matkul']} - {sesi['tanggal']}" if sesi else sesi_id
+
+
+def pilih_sesi():
+    """Selector sesi (partisi matkul + tanggal) + form sesi baru"""
+    if 'sesi_pending' in st.session_state:
+        st.session_state.sesi = st.session_state.pop('sesi_pending')
+    
+    def ganti_sesi():
+        st.session_state.pop('data', None)
+        st.session_state.pop('pdf_data', None)
+    
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        options = [None] + [s['id'] for s in list_sessions()]
+        st.selectbox("🗂️ Sesi Kuliah", options, format_func=format_sesi, key="sesi", on_change=ganti_sesi)
+    with col2:
+        with st.expander("➕ Sesi baru"):
+            matkul = st.text_input("Mata Kuliah", key="sesi_matkul")
+            tanggal = st.date_input("Tanggal", key="sesi_tanggal")
+            if st.button("Buat Sesi", use_container_width=True) and matkul:
+                sesi_id = create_session(matkul, tanggal)
+                get_store(session=sesi_id).save({'matkul': matkul, 'tanggal': tanggal.strftime("%d %B %Y")})
+                ganti_sesi()
+                st.session_state.sesi_pending = sesi_id
+                st.rerun()
+
+
+@timed('load_data')
 def load_data():
-    """Load data dari JSON"""
-    if DATA_FILE.exists():
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-            for key in ['matkul', 'sks', 'dosen', 'prodi', 'jam', 'tanggal', 'ttd_tempat', 'ttd_tanggal', 'ttd_nama', 'link_presentasi', 'link_rekaman']:
-                if key in data and data[key] is not None:
-                    data[key] = str(data[key])
-            return data
-    return empty_data()
+    """Load data dari store (field teks di-coerce sekali oleh model Laporan)"""
+    data = {**empty_data(), **current_store().load()}
+    laporan = Laporan.from_dict(data)
+    data.update({key: getattr(laporan, key) for key in TEXT_FIELDS})
+    return data
 
 
 def empty_data():
@@ -60,14 +134,116 @@ def empty_data():
         'ttd_nama': 'Dra. Asmawati M.Pd',
         'link_presentasi': '',
         'link_rekaman': '',
-        'signature': None
+        'signature': None,
+        'signature_ref': None
     }
 
 
+def commit_signature(data):
+    """Pindahkan tanda tangan dari canvas (PNG di session_state) ke blob store.
+
+    Hanya saat Simpan/Generate: setiap coretan memicu rerun, dan blob yang
+    sudah ditulis tidak pernah dihapus.
+    """
+    png = st.session_state.pop('ttd_png', None)
+    if png:
+        data['signature_ref'] = put_blob(png)
+        data['signature'] = None
+
+
+@timed('save_data')
 def save_data(data):
-    """Save data"""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Save data laporan (absensi mahasiswa dikelola lewat upsert di store)"""
+    commit_signature(data)
+    current_store().save(data)
+
+
+def daftar_hadir():
+    """Statistik + tabel daftar hadir (dibaca dari cache store)"""
+    store = current_store()
+    mahasiswa = store.load_cached()['mahasiswa']
+    
+    # Stats
+    if mahasiswa:
+        summary = store.summary()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total", summary['total'])
+        with col2:
+            st.metric("Hadir", summary['Hadir'])
+        with col3:
+            st.metric("Tidak Hadir", summary['Tidak Hadir'])
+        with col4:
+            st.metric("Izin/Sakit", summary['Izin'] + summary['Sakit'])
+        
+        st.divider()
+    
+    # View only - Display data
+    if mahasiswa:
+        # Search, filter & sort (semua di server)
+        col1, col2, col3 = st.columns([3, 2, 2])
+        with col1:
+            search = st.text_input("🔍 Cari mahasiswa (nama / NPM)", key="search_mhs")
+        with col2:
+            status_filter = st.multiselect("Status", STATUS_OPTIONS, key="filter_status")
+        with col3:
+            sort_by = st.selectbox("Urutkan", list(SORT_COLUMNS), key="sort_mhs")
+        
+        df = mahasiswa_frame(st.session_state.get('sesi'), mahasiswa)
+        if search:
+            needle = search.lower()
+            df = df[df['Nama'].str.lower().str.contains(needle, regex=False)
+                    | df['NPM'].str.contains(needle, regex=False)]
+        if status_filter:
+            df = df[df['Status'].isin(status_filter)]
+        if SORT_COLUMNS[sort_by]:
+            df = df.sort_values(SORT_COLUMNS[sort_by], kind='stable', key=lambda col: col.str.lower())
+        
+        if len(df):
+            # Pagination - payload ke browser konstan berapapun jumlah mahasiswa
+            pages = (len(df) - 1) // PAGE_SIZE + 1
+            if st.session_state.get('page_mhs', 1) > pages:
+                st.session_state.page_mhs = pages
+            page = st.number_input("Halaman", min_value=1, max_value=pages, step=1, key="page_mhs") if pages > 1 else 1
+            start = (page - 1) * PAGE_SIZE
+            
+            st.write(f"📊 Menampilkan {start + 1}-{min(start + PAGE_SIZE, len(df))} dari {len(df)} "
+                     f"(total {len(mahasiswa)} mahasiswa)")
+            st.dataframe(df.iloc[start:start + PAGE_SIZE], hide_index=True, use_container_width=True)
+        else:
+            st.info("Tidak ditemukan")
+    
+    else:
+        st.warning("⚠️ Belum ada data absensi. Mahasiswa dapat mengisi absensi di **http://localhost:8502**")
+
+
+def status_pdf_job():
+    """Tampilkan progress job PDF. Return True jika job sudah selesai/tidak ada."""
+    job = get_queue().get(st.session_state.get('pdf_job'))
+    if job is None:
+        st.session_state.pdf_job = None
+        return True
+    
+    if job.done:
+        # take(): job lepas dari antrian (status/hasil tidak berubah lagi) dan
+        # PDF hanya ditahan di session state
+        get_queue().take(job.id)
+        st.session_state.pdf_job = None
+        if job.status == SELESAI:
+            st.session_state.pdf_data = job.result
+            st.rerun()
+        st.error(f"❌ Error: {job.error}")
+        return True
+    
+    progress = job.progress
+    if job.status == ANTRI:
+        st.info(f"⏳ Menunggu antrian ({get_queue().pending()} job)...")
+    else:
+        photos_total = progress.get('photos_total', 0)
+        st.write(f"📄 Creating PDF... halaman {progress.get('pages', 0)}"
+                 + (f", foto {progress.get('photos', 0)}/{photos_total}" if photos_total else ""))
+        st.progress(progress.get('photos', 0) / photos_total if photos_total else 0.5)
+    return False
 
 
 def main():
@@ -75,6 +251,9 @@ def main():
     
     st.title("📝 Laporan Kuliah Daring")
     
+    pilih_sesi()
+    store = current_store()
+    
     # Load data
     if 'data' not in st.session_state:
         st.session_state.data = load_data()
@@ -84,10 +263,12 @@ def main():
         st.session_state.menu = "info"
     
     data = st.session_state.data
+    # Absensi selalu yang terbaru (murah: hanya dibaca ulang jika revisi store berubah)
+    data['mahasiswa'] = store.load_cached()['mahasiswa']
     
     # NAVIGATION BUTTONS - Mobile Friendly
     st.markdown("### 📋 Menu")
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         if st.button("📚 Informasi", use_container_width=True, type="primary" if st.session_state.menu == "info" else "secondary"):
@@ -109,6 +290,11 @@ def main():
             st.session_state.menu = "generate"
             st.rerun()
     
+    with col5:
+        if st.button("📊 Rekap", use_container_width=True, type="primary" if st.session_state.menu == "rekap" else "secondary"):
+            st.session_state.menu = "rekap"
+            st.rerun()
+    
     # ========== MENU 1: INFORMASI KULIAH ==========
     if st.session_state.menu == "info":
         st.markdown("## 📚 Informasi Kuliah")
@@ -170,83 +356,60 @@ def main():
         
         st.info("📌 Data absensi diinput oleh mahasiswa melalui **Form Absensi (Port 8502)**")
         
-        mahasiswa = data.get('mahasiswa', [])
-        
         # Refresh button
-        if st.button("🔄 Refresh Data", use_container_width=True):
-            st.session_state.data = load_data()
-            st.rerun()
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if st.button("🔄 Refresh Data", use_container_width=True):
+                st.session_state.data = load_data()
+                st.rerun()
+        with col2:
+            live = st.toggle(f"🔴 Live ({LIVE_INTERVAL} detik)", key="live_mhs") if _fragment else False
         
         st.divider()
         
-        # Stats
-        if mahasiswa:
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Total", len(mahasiswa))
-            with col2:
-                hadir = len([m for m in mahasiswa if m['status'] == 'Hadir'])
-                st.metric("Hadir", hadir)
-            with col3:
-                tidak_hadir = len([m for m in mahasiswa if m['status'] == 'Tidak Hadir'])
-                st.metric("Tidak Hadir", tidak_hadir)
-            with col4:
-                lainnya = len([m for m in mahasiswa if m['status'] in ['Izin', 'Sakit']])
-                st.metric("Izin/Sakit", lainnya)
-            
-            st.divider()
-        
-        # View only - Display data
-        if mahasiswa:
-            # Search
-            search = st.text_input("🔍 Cari mahasiswa (ketik nama)", key="search_mhs")
-            
-            # Filter and display
-            display_list = mahasiswa
-            if search:
-                display_list = [m for m in mahasiswa if search.lower() in m['nama'].lower()]
-            
-            if display_list:
-                st.write(f"📊 Menampilkan {len(display_list)} dari {len(mahasiswa)} mahasiswa")
-                st.divider()
-                
-                # Table view
-                for i, mhs in enumerate(display_list, 1):
-                    col1, col2, col3, col4 = st.columns([1, 3, 2, 2])
-                    
-                    with col1:
-                        st.write(f"**{i}.**")
-                    with col2:
-                        st.write(f"**{mhs['nama']}**")
-                    with col3:
-                        st.write(f"NPM: {mhs.get('npm', '-')}")
-                    with col4:
-                        status_icon = "✅" if mhs['status'] == 'Hadir' else "❌" if mhs['status'] == 'Tidak Hadir' else "⚠️"
-                        st.write(f"{status_icon} {mhs['status']}")
-                    
-                    # Show timestamp if available
-                    if mhs.get('waktu_absen'):
-                        st.caption(f"⏰ Absen: {mhs.get('waktu_absen')}")
-                    
-                    # Show keterangan if available
-                    if mhs.get('keterangan'):
-                        st.caption(f"💬 {mhs.get('keterangan')}")
-                    
-                    st.divider()
-            else:
-                st.info("Tidak ditemukan")
-        
+        if live:
+            # Hanya bagian daftar hadir yang di-rerun berkala, dan hanya
+            # membaca ulang data jika revisi store berubah
+            _fragment(run_every=LIVE_INTERVAL)(daftar_hadir)()
         else:
-            st.warning("⚠️ Belum ada data absensi. Mahasiswa dapat mengisi absensi di **http://localhost:8502**")
+            daftar_hadir()
         
         st.divider()
         
+        # Daftar kelas resmi: form absensi menyarankan & mencocokkan nama ke roster
+        key = roster_key(st.session_state.get('sesi'), data.get('matkul'))
+        roster = get_roster(key)
+        with st.expander(f"📋 Daftar Kelas ({len(roster)} mahasiswa)" if roster else "📋 Import Daftar Kelas"):
+            if key is None:
+                st.warning("⚠️ Isi Mata Kuliah di menu Informasi terlebih dahulu")
+            else:
+                st.caption("CSV/XLSX dengan kolom Nama dan NPM/NIM. Check-in mahasiswa akan dicocokkan ke daftar ini.")
+                file = st.file_uploader("File daftar kelas", type=['csv', 'xlsx'], key="roster_file")
+                if file and st.button("⬆️ Import", use_container_width=True):
+                    try:
+                        count = import_roster(key, file.getvalue(), file.name)
+                        st.success(f"✅ {count} mahasiswa di-import")
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                if roster and st.button("Hapus Daftar Kelas", type="secondary"):
+                    delete_roster(key)
+                    st.rerun()
+        
+        # Arsip semester: rekap per mahasiswa diperbarui saat sesi diarsipkan
+        if st.button("📦 Arsipkan Sesi", use_container_width=True):
+            try:
+                info = get_archive().archive(data, sesi=st.session_state.get('sesi'))
+                st.success(f"✅ Sesi {info['tanggal']} diarsipkan ke rekap {info['semester']} ({info['jumlah']} mahasiswa)")
+            except ValueError as e:
+                st.error(str(e))
+        
         # Option to clear all data
         with st.expander("🗑️ Hapus Semua Data Absensi"):
             st.warning("⚠️ Akan menghapus SEMUA data absensi mahasiswa!")
             if st.button("Hapus Semua Absensi", type="secondary"):
                 data['mahasiswa'] = []
-                save_data(data)
+                store.clear_mahasiswa()
                 st.success("✅ Data absensi dihapus")
                 st.rerun()
     
@@ -275,14 +438,18 @@ def main():
                 key="ttd_canvas"
             )
             
-            if canvas_result.image_data is not None:
-                # Save signature
-                from PIL import Image
-                import io
-                img = Image.fromarray(canvas_result.image_data.astype('uint8'))
-                buffered = io.BytesIO()
-                img.save(buffered, format="PNG")
-                data['signature'] = base64.b64encode(buffered.getvalue()).decode()
+            # Encode ulang hanya jika coretan berubah; blob ditulis saat Simpan
+            strokes = (canvas_result.json_data or {}).get('objects') or []
+            strokes_key = stable_hash(strokes)
+            if strokes and canvas_result.image_data is not None and st.session_state.get('ttd_strokes') != strokes_key:
+                png = encode_signature(canvas_result.image_data)
+                if png:
+                    st.session_state.ttd_png = png
+                st.session_state.ttd_strokes = strokes_key
+            
+            if st.session_state.get('ttd_png'):
+                st.info("✍️ Tanda tangan baru, klik Simpan untuk menyimpan")
+            elif data.get('signature_ref') or data.get('signature'):
                 st.success("✅ Tanda tangan tersimpan")
         except:
             st.warning("Install: pip install streamlit-drawable-canvas")
@@ -303,10 +470,9 @@ def main():
             st.write(f"**Dosen:** {data.get('dosen', '-')}")
             st.write(f"**Tanggal:** {data.get('tanggal', '-')}")
         with col2:
-            mahasiswa = data.get('mahasiswa', [])
-            hadir = len([m for m in mahasiswa if m['status'] == 'Hadir'])
-            st.write(f"**Total Mahasiswa:** {len(mahasiswa)}")
-            st.write(f"**Hadir:** {hadir}")
+            summary = store.summary()
+            st.write(f"**Total Mahasiswa:** {summary['total']}")
+            st.write(f"**Hadir:** {summary['Hadir']}")
             st.write(f"**Catatan:** {len(data.get('catatan', []))} item")
         
         st.divider()
@@ -317,6 +483,15 @@ def main():
         uploaded_files = st.file_uploader("Pilih foto", type=['jpg', 'jpeg', 'png'], accept_multiple_files=True)
         
         if uploaded_files:
+            # Cek ukuran dari header saja, tolak foto yang terlalu besar sebelum diproses
+            accepted = []
+            for file in uploaded_files[:8]:  # Max 8 foto
+                try:
+                    photo_pixels(file)
+                    accepted.append(file)
+                except Exception as e:
+                    st.warning(f"⚠️ {file.name} dilewati: {e}")
+            uploaded_files = accepted
             st.success(f"✅ {len(uploaded_files)} foto siap diupload")
         
         st.divider()
@@ -334,8 +509,7 @@ def main():
                 if st.session_state.get('confirm_delete'):
                     data = empty_data()
                     st.session_state.data = data
-                    if DATA_FILE.exists():
-                        os.unlink(DATA_FILE)
+                    store.reset()
                     st.session_state.confirm_delete = False
                     st.success("✅ Data dihapus")
                     st.rerun()
@@ -345,54 +519,43 @@ def main():
         
         with col3:
             if st.button("📥 Generate PDF", use_container_width=True, type="primary"):
-                # Validasi
-                is_valid, msg = validate_laporan_data(data)
+                commit_signature(data)
+                # Validasi (Laporan juga jadi snapshot data untuk job PDF)
+                laporan = Laporan.from_dict(data)
+                is_valid, msg = laporan.validate()
                 if not is_valid:
                     st.error(msg)
                 else:
-                    with st.spinner('⏳ Generating PDF...'):
-                        try:
-                            # Save current data
-                            save_data(data)
-                            
-                            # Process photos
-                            photo_paths = []
-                            if uploaded_files:
-                                st.write("📤 Processing photos...")
-                                for file in uploaded_files[:8]:  # Max 8 foto
-                                    file_ext = Path(file.name).suffix.lower() or '.jpg'
-                                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_ext)
-                                    temp_file.write(file.getbuffer())
-                                    temp_file.close()
-                                    photo_paths.append(temp_file.name)
-                            
-                            # Generate PDF
-                            st.write("📄 Creating PDF...")
-                            pdf_path = generate_simple_pdf(data, photo_paths)
-                            
-                            # Read PDF to memory
-                            with open(pdf_path, 'rb') as f:
-                                pdf_data = f.read()
-                            
-                            # Store in session state
-                            st.session_state.pdf_data = pdf_data
-                            st.session_state.pdf_filename = f"Laporan_{data['matkul'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                            
-                            # Cleanup
-                            os.unlink(pdf_path)
-                            for photo in photo_paths:
-                                try:
-                                    os.unlink(photo)
-                                except:
-                                    pass
-                            
-                            st.success("✅ PDF berhasil dibuat!")
-                        
-                        except Exception as e:
-                            st.error(f"❌ Error: {str(e)}")
+                    # Save current data
+                    save_data(data)
+                    
+                    # Photos di-stream langsung dari buffer upload (tanpa copy / file sementara)
+                    photos = list(uploaded_files or [])
+                    
+                    # Render di background worker; UI hanya polling status job
+                    try:
+                        st.session_state.pdf_job = get_queue().submit(generate_pdf_cached, laporan, photos)
+                        st.session_state.pdf_data = None
+                        st.session_state.pdf_filename = f"Laporan_{data['matkul'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                    except QueueFull:
+                        st.error("⏳ Antrian PDF sedang penuh, coba beberapa saat lagi")
+        
+        if st.session_state.get('pdf_job'):
+            if _fragment:
+                _fragment(run_every=1)(status_pdf_job)()
+            elif not status_pdf_job():
+                time.sleep(1)
+                st.rerun()
         
         # Show download button if PDF ready
         if 'pdf_data' in st.session_state and st.session_state.pdf_data:
+            st.success("✅ PDF berhasil dibuat!")
+            stats = get_pdf_cache().stats()
+            caption = f"⚡ Cache PDF: {stats['hits']} hit / {stats['misses']} miss"
+            if get_photo_cache() is not None:
+                photo_stats = get_photo_cache().stats()
+                caption += f" · Cache foto: {photo_stats['hits']} hit / {photo_stats['misses']} miss"
+            st.caption(caption)
             st.divider()
             st.download_button(
                 label="⬇️ Download PDF",
@@ -403,6 +566,49 @@ def main():
                 type="primary"
             )
 
+    
+    # ========== MENU 5: REKAP SEMESTER ==========
+    elif st.session_state.menu == "rekap":
+        st.markdown("## 📊 Rekap Kehadiran Semester")
+        
+        courses = get_archive().courses()
+        if not courses:
+            st.info("📭 Belum ada sesi yang diarsipkan (menu Mahasiswa → 📦 Arsipkan Sesi)")
+            return
+        
+        course = st.selectbox("Semester / Mata Kuliah", courses,
+                              format_func=lambda c: f"{c['semester']} - {c['matkul']} ({c['pertemuan']} pertemuan)",
+                              on_change=lambda: st.session_state.pop('rekap_pdf', None))
+        rekap = get_archive().recap(course['semester'], course['matkul'])
+        
+        if rekap['mahasiswa']:
+            import pandas as pd
+            
+            df = pd.DataFrame.from_records(rekap['mahasiswa'])
+            df = df.rename(columns={'nama': 'Nama', 'npm': 'NPM', 'hadir': 'Hadir', 'izin': 'Izin',
+                                    'sakit': 'Sakit', 'alpa': 'Alpa', 'persen': '% Hadir'})
+            df.insert(0, 'No', range(1, len(df) + 1))
+            st.dataframe(df, use_container_width=True, hide_index=True,
+                         column_config={'% Hadir': st.column_config.NumberColumn(format="%.1f")})
+        
+        with st.expander(f"🗂️ Sesi terarsip ({rekap['pertemuan']})"):
+            for sesi in get_archive().sessions(course['semester'], course['matkul']):
+                st.write(f"{sesi['tanggal']} - {sesi['jumlah']} mahasiswa (diarsipkan {sesi['diarsipkan']})")
+        
+        if st.button("📄 Buat PDF Rekap", use_container_width=True, type="primary"):
+            st.session_state.rekap_pdf = generate_rekap_pdf(rekap)
+            st.session_state.rekap_filename = (f"Rekap_{rekap['matkul'].replace(' ', '_')}_"
+                                               f"{rekap['semester'].replace('/', '-').replace(' ', '_')}.pdf")
+        if st.session_state.get('rekap_pdf'):
+            st.download_button(
+                label="⬇️ Download PDF Rekap",
+                data=st.session_state.rekap_pdf,
+                file_name=st.session_state.rekap_filename,
+                mime="application/pdf",
+                use_container_width=True
+            )
 
 if __name__ == "__main__":
-    main()
+    start_file_export('dosen')
+    with span('rerun', app='dosen'), profile('dosen'):
+        main()
@@ -0,0 +1,61 @@
+"""
+API check-in: sesi tidak dikenal / bukan string ditolak tanpa membuat partisi
+
+    python -m pytest -q tests
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import checkin_api  # noqa: E402
+import storage  # noqa: E402
+from checkin_api import BadRequest, handle_request  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DB_FILE', tmp_path / 'laporan.db')
+    monkeypatch.setattr(storage, 'DATA_FILE', tmp_path / 'laporan_data.json')
+    monkeypatch.setattr(storage, 'SESSIONS_DIR', tmp_path / 'sesi')
+    monkeypatch.setattr(storage, 'SESSIONS_INDEX', tmp_path / 'sesi_index.json')
+    return tmp_path
+
+
+def request(method, target, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    return asyncio.run(handle_request(method, target, body))
+
+
+def status_of(method, target, payload=None):
+    try:
+        return request(method, target, payload)[0]
+    except BadRequest as e:
+        return e.status
+
+
+def test_unknown_session_rejected(data_dir):
+    sesi = 'tidak-ada_2025-01-01'
+    assert status_of('POST', '/api/checkin', {'nama': 'Budi Santoso', 'sesi': sesi}) == 400
+    assert status_of('GET', f'/api/summary?sesi={sesi}') == 400
+    assert status_of('GET', f'/api/stats?sesi={sesi}') == 400
+    assert status_of('GET', f'/api/roster?sesi={sesi}&q=bud') == 400
+    assert not (data_dir / 'sesi').exists()
+
+
+@pytest.mark.parametrize('sesi', [123, ['a'], {'id': 'x'}, True])
+def test_non_string_session_rejected(data_dir, sesi):
+    assert status_of('POST', '/api/checkin', {'nama': 'Budi Santoso', 'sesi': sesi}) == 400
+
+
+def test_registered_session_checkin(data_dir):
+    sesi = storage.create_session('Metodologi Penelitian', '2025-05-12')
+    status, _, body = request('POST', '/api/checkin', {'nama': 'Budi Santoso', 'sesi': sesi})
+    assert status == 200
+    assert json.loads(body)['summary']['Hadir'] == 1
+    assert checkin_api._store(sesi).summary()['total'] == 1
@@ -0,0 +1,67 @@
+"""
+Antrian job PDF: hasil dilepas saat diambil, total hasil yang ditahan dibatasi
+
+    python -m pytest -q tests
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jobs import GAGAL, SELESAI, Job, JobQueue  # noqa: E402
+
+
+def render(size, progress=None):
+    return b'x' * size
+
+
+def wait(queue, job_id):
+    deadline = time.monotonic() + 5
+    # pending() turun setelah job selesai dan _purge berjalan
+    while not queue.get(job_id).done or queue.pending():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    return queue.get(job_id)
+
+
+def test_take_releases_result():
+    queue = JobQueue(workers=1, max_jobs=2)
+    job_id = queue.submit(render, 10)
+    assert wait(queue, job_id).status == SELESAI
+    job = queue.take(job_id)
+    assert job.result == b'x' * 10
+    assert queue.get(job_id) is None
+    assert queue.take(job_id) is None
+
+
+def test_unfetched_results_capped():
+    queue = JobQueue(workers=1, max_jobs=4, max_result_bytes=250)
+    ids = []
+    for _ in range(3):
+        ids.append(queue.submit(render, 100))
+        wait(queue, ids[-1])
+    oldest = queue.get(ids[0])
+    assert oldest.status == GAGAL and oldest.result is None and oldest.error
+    assert all(queue.get(job_id).status == SELESAI for job_id in ids[1:])
+
+
+def test_purge_tolerates_job_without_finished():
+    # Job yang statusnya sudah selesai tapi finished belum diisi (celah di _run)
+    queue = JobQueue(workers=1, max_jobs=4, max_result_bytes=150)
+    for i in range(2):
+        job = Job(f'celah-{i}')
+        job.status, job.result = SELESAI, b'x' * 100
+        queue._jobs[job.id] = job
+    job_id = queue.submit(render, 10)
+    assert wait(queue, job_id).status == SELESAI
+
+
+def test_failed_job_reports_error():
+    def broken(progress=None):
+        raise RuntimeError('font rusak')
+
+    queue = JobQueue(workers=1, max_jobs=2)
+    job = wait(queue, queue.submit(broken))
+    assert job.status == GAGAL and job.error == 'font rusak' and job.finished
@@ -0,0 +1,103 @@
+"""
+Smoke test render PDF: font bawaan valid dan subset glyph per dokumen
+
+    python -m pytest -q tests
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip('fpdf')
+
+import utils_simple  # noqa: E402
+from utils_simple import generate_rekap_pdf, generate_simple_pdf  # noqa: E402
+
+
+def laporan(nama):
+    return {
+        'matkul': 'Metodologi Penelitian',
+        'dosen': 'Dra. Asmawati M.Pd',
+        'tanggal': '12 Mei 2025',
+        'mahasiswa': [{'nama': nama, 'npm': '2021001', 'status': 'Hadir'},
+                      {'nama': 'Siti Rahmawati', 'npm': '2021002', 'status': 'Izin'}],
+        'catatan': ['Diskusi bab 3'],
+    }
+
+
+def test_bundled_fonts_valid():
+    assert utils_simple.UNICODE_FONT, "fonts/NotoSans-*.ttf bukan font TTF yang valid"
+
+
+def test_render_pdf():
+    pdf = generate_simple_pdf(laporan('Ngũyễn Çağlar Ñúñez'), in_memory=True)
+    assert pdf.startswith(b'%PDF')
+    assert b'NotoSans' in pdf
+
+
+def test_glyph_subset_per_document():
+    # Dokumen kedua memakai glyph yang tidak ada di dokumen pertama
+    generate_simple_pdf(laporan('AAAA'), in_memory=True)
+    assert generate_simple_pdf(laporan('WWWW'), in_memory=True).startswith(b'%PDF')
+
+    names = [chr(ord('A') + i) * 6 for i in range(24)]
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda nama: generate_simple_pdf(laporan(nama), in_memory=True), names))
+    assert all(pdf.startswith(b'%PDF') for pdf in results)
+
+
+def test_font_cache_fresh_subset_per_document():
+    # Parse font dipakai bersama; ttfont dan SubsetMap harus milik tiap dokumen
+    prototype = utils_simple._parsed_font('')[0]
+    glyphs = len(prototype.ttfont.getGlyphOrder())
+    from fpdf import FPDF
+    documents = []
+    for _ in range(2):
+        pdf = FPDF()
+        utils_simple.register_fonts(pdf)
+        documents.append(pdf.fonts[prototype.fontkey])
+    assert documents[0].ttfont is not documents[1].ttfont
+    assert documents[0].subset is not documents[1].subset
+
+    first = generate_simple_pdf(laporan('AAAA'), in_memory=True)
+    second = generate_simple_pdf(laporan('WWWW Ŝ'), in_memory=True)
+    assert first.startswith(b'%PDF') and second.startswith(b'%PDF')
+    assert set(utils_simple._font_cache) == set(utils_simple.FONT_FILES)
+    assert len(prototype.ttfont.getGlyphOrder()) == glyphs
+
+
+def test_photo_cache_respects_limits(tmp_path, monkeypatch):
+    from io import BytesIO
+
+    from PIL import Image
+
+    from cache import DiskLRUCache
+
+    buffer = BytesIO()
+    Image.new('RGB', (1600, 1200), 'white').save(buffer, 'PNG')
+    photo = buffer.getvalue()
+    monkeypatch.setattr(utils_simple, '_photo_cache', DiskLRUCache(tmp_path, 1024 * 1024, suffix='.img'))
+
+    key = utils_simple.photo_cache_key(photo)
+    assert utils_simple.preprocess_photos([photo])[0] is not None
+    assert utils_simple._photo_cache.get(key) is not None
+
+    # Batas diturunkan: foto yang sudah di-cache tetap ditolak, key ikut berubah
+    monkeypatch.setattr(utils_simple, 'MAX_OTHER_PIXELS', 1_000_000)
+    assert utils_simple.photo_cache_key(photo) != key
+    assert utils_simple.preprocess_photos([photo]) == [None]
+
+
+def test_render_rekap_pdf():
+    rekap = {
+        'semester': '2024/2025 Genap',
+        'matkul': 'Metodologi Penelitian',
+        'pertemuan': 2,
+        'mahasiswa': [{'npm': '2021001', 'nama': 'Budi Santoso', 'hadir': 1, 'izin': 1,
+                       'sakit': 0, 'alpa': 0, 'persen': 50.0}],
+    }
+    assert generate_rekap_pdf(rekap).startswith(b'%PDF')
@@ -0,0 +1,69 @@
+"""
+Roster: file XLSX rusak ditolak sebagai ValueError, matkul dibaca lewat get_meta,
+load_cached per instance store
+
+    python -m pytest -q tests
+"""
+
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from roster import parse_roster  # noqa: E402
+from storage import JournalStore, SQLiteStore  # noqa: E402
+
+
+def zip_bytes(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('content', [
+    b'bukan file xlsx',
+    b'PK\x03\x04' + b'\x00' * 40,
+    zip_bytes({'readme.txt': 'tanpa workbook'}),
+    zip_bytes({'[Content_Types].xml': '<Types', 'xl/workbook.xml': '<workbook'}),
+])
+def test_corrupt_xlsx_is_value_error(content):
+    pytest.importorskip('openpyxl')
+    with pytest.raises(ValueError, match='XLSX'):
+        parse_roster(content, 'kelas.xlsx')
+
+
+def test_csv_roster():
+    entries = parse_roster(b'Nama;NPM\nBudi Santoso;2021001\nSiti Rahmawati;2021002\n', 'kelas.csv')
+    assert [(e.nama, e.npm) for e in entries] == [('Budi Santoso', '2021001'), ('Siti Rahmawati', '2021002')]
+
+
+@pytest.mark.parametrize('cls, name', [(SQLiteStore, 'laporan.db'), (JournalStore, 'laporan_data.json')])
+def test_get_meta(tmp_path, cls, name):
+    store = cls(tmp_path / name)
+    try:
+        assert store.get_meta('matkul', '') == ''
+        store.save({'matkul': 'Metodologi Penelitian', 'dosen': 'Dra. Asmawati M.Pd'})
+        store.upsert_mahasiswa('Budi Santoso', 'Hadir', '2021001')
+        assert store.get_meta('matkul') == 'Metodologi Penelitian'
+        assert store.get_meta('tidak-ada', 'x') == 'x'
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize('cls, name', [(SQLiteStore, 'laporan.db'), (JournalStore, 'laporan_data.json')])
+def test_load_cached_per_store(tmp_path, cls, name):
+    first, second = cls(tmp_path / 'a' / name), cls(tmp_path / 'b' / name)
+    try:
+        assert first._cached_lock is not second._cached_lock
+        first.upsert_mahasiswa('Budi Santoso', 'Hadir', '2021001')
+        assert [m.nama for m in first.load_cached()['mahasiswa']] == ['Budi Santoso']
+        assert second.load_cached()['mahasiswa'] == []
+    finally:
+        first.close()
+        second.close()
@@ -1,74 +1,592 @@
 """
 Simple PDF Generator untuk Laporan Kuliah Daring
 No fancy features - just works!
+
+fpdf dan PIL baru di-import saat PDF/foto benar-benar diproses, supaya
+rerun Streamlit dan start container tidak membayar biaya import-nya.
 """
 
+import copy
+import logging
 import os
 import tempfile
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Union
 
-from fpdf import FPDF
+from metrics import Phases, profile, span, timed
+from models import Laporan, as_mahasiswa
 
+# Font Unicode bawaan (fonts/). Jika tidak ada / bukan font yang valid,
+# kembali ke core Arial (ASCII saja)
+FONT_DIR = Path(__file__).resolve().parent / 'fonts'
+FONT_FILES = {
+    '': 'NotoSans-Regular.ttf',
+    'B': 'NotoSans-Bold.ttf',
+    'I': 'NotoSans-Italic.ttf',
+}
+# sfnt version di 4 byte pertama: TrueType (0x00010000 / 'true') atau OpenType CFF
+FONT_MAGIC = (b'\x00\x01\x00\x00', b'true', b'OTTO')
 
-class LaporanPDF(FPDF):
-    """Simple PDF class"""
-    
-    def header(self):
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 15, 'LAPORAN PERKULIAHAN DARING', 0, 1, 'C')
-        self.line(10, 25, 200, 25)
-        self.ln(5)
-    
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Halaman {self.page_no()}', 0, 0, 'C')
+
+def _is_font_file(path: Path) -> bool:
+    """True jika file benar-benar TTF/OTF (bukan mis. halaman HTML hasil unduhan yang salah)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(4) in FONT_MAGIC
+    except OSError:
+        return False
+
+
+UNICODE_FONT = all(_is_font_file(FONT_DIR / name) for name in FONT_FILES.values())
+FONT = 'NotoSans' if UNICODE_FONT else 'Arial'
+if not UNICODE_FONT and FONT_DIR.exists():
+    print(f"⚠️ Font di {FONT_DIR} tidak valid, PDF memakai Arial (ASCII saja)")
+
+# Subset Noto Sans membuang tabel hinting TTFA; fontTools mencatatnya sebagai
+# warning di setiap render
+logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
+
+_font_cache = {}
+_font_cache_lock = threading.Lock()
+
+
+def _parsed_font(style: str):
+    """(TTFFont hasil parse, isi file) untuk satu style, dibaca sekali per proses.
+
+    TTFFont ini hanya prototipe: cmap, lebar glyph, glyph id dan descriptor
+    dipakai bersama, sedangkan ttfont dan subset dibuat baru per dokumen.
+    """
+    with _font_cache_lock:
+        cached = _font_cache.get(style)
+        if cached is None:
+            from fpdf import FPDF
+            from fpdf.fonts import TTFFont
+
+            path = FONT_DIR / FONT_FILES[style]
+            cached = _font_cache[style] = (TTFFont(FPDF(), path, f'{FONT.lower()}{style}', style),
+                                           path.read_bytes())
+        return cached
+
+
+def register_fonts(pdf):
+    """Daftarkan font Unicode ke pdf (no-op jika memakai core font).
+
+    Parse font (cmap, metrik glyph) di-cache per proses. Setiap dokumen
+    mendapat salinan dengan ttfont dan SubsetMap sendiri: fpdf men-subset
+    ttfont di tempat saat output, jadi objek itu tidak boleh dipakai bersama.
+    """
+    if not UNICODE_FONT:
+        return
+    from fontTools.ttLib import TTFont
+    from fpdf.fonts import SubsetMap
+
+    for style in FONT_FILES:
+        prototype, data = _parsed_font(style)
+        if prototype.fontkey in pdf.fonts:
+            continue
+        font = copy.copy(prototype)
+        font.i = len(pdf.fonts) + 1
+        font.ttfont = TTFont(BytesIO(data), recalcTimestamp=False, lazy=True)
+        font._hbfont = None
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        font.subset = SubsetMap(font)
+        pdf.fonts[font.fontkey] = font
+
+
+_font_charset = None
+
+
+def font_charset() -> frozenset:
+    """Code point yang punya glyph di font (dari cmap font yang di-cache)"""
+    global _font_charset
+    if _font_charset is None:
+        _font_charset = frozenset(_parsed_font('')[0].cmap)
+    return _font_charset
+
+
+_pdf_class = None
+
+
+def _laporan_pdf_class():
+    """Kelas LaporanPDF (subclass FPDF), dibuat saat pertama kali dibutuhkan"""
+    global _pdf_class
+    if _pdf_class is not None:
+        return _pdf_class
+
+    from fpdf import FPDF
+
+    class LaporanPDF(FPDF):
+        """Simple PDF class"""
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            register_fonts(self)
+            # Callback progress opsional: progress(pages=n)
+            self.progress = None
+            self.judul = 'LAPORAN PERKULIAHAN DARING'
+        
+        def header(self):
+            if self.progress:
+                self.progress(pages=self.page_no())
+            self.set_font(FONT, 'B', 16)
+            self.cell(0, 15, self.judul, 0, 1, 'C')
+            self.line(10, 25, 200, 25)
+            self.ln(5)
+        
+        def footer(self):
+            self.set_y(-15)
+            self.set_font(FONT, 'I', 8)
+            self.cell(0, 10, f'Halaman {self.page_no()}', 0, 0, 'C')
+
+    _pdf_class = LaporanPDF
+    return _pdf_class
+
+
+def __getattr__(name):
+    # `from utils_simple import LaporanPDF` tetap berfungsi (import fpdf saat itu)
+    if name == 'LaporanPDF':
+        return _laporan_pdf_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def clean_string(text):
-    """Convert any value to clean ASCII string"""
+    """Convert any value to a string the report font can render
+
+    Dengan font Unicode: normalisasi NFC (diakritik jadi satu glyph) dan
+    buang karakter yang tidak ada glyph-nya (mis. emoji). Tanpa font
+    Unicode: hanya ASCII.
+    """
     if text is None:
         return ''
     text = str(text)
-    # Remove all non-ASCII characters
-    return text.encode('ascii', errors='ignore').decode('ascii')
+    if text.isascii():
+        return text
+    if not UNICODE_FONT:
+        # Remove all non-ASCII characters
+        return text.encode('ascii', errors='ignore').decode('ascii')
+    text = unicodedata.normalize('NFC', text)
+    charset = font_charset()
+    return ''.join(ch for ch in text if ord(ch) in charset or ch in '\n\t')
 
 
-def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
-    """Generate PDF - simple and reliable"""
-    
-    # Clean ALL data first
-    matkul = clean_string(data.get('matkul', ''))
-    sks = clean_string(data.get('sks', ''))
-    dosen = clean_string(data.get('dosen', ''))
-    prodi = clean_string(data.get('prodi', ''))
-    jam = clean_string(data.get('jam', ''))
-    tanggal = clean_string(data.get('tanggal', ''))
-    
-    mahasiswa = data.get('mahasiswa', [])
-    catatan = data.get('catatan', [])
-    
-    ttd_tempat = clean_string(data.get('ttd_tempat', ''))
-    ttd_tanggal = clean_string(data.get('ttd_tanggal', ''))
-    ttd_nama = clean_string(data.get('ttd_nama', ''))
-    
-    link_presentasi = clean_string(data.get('link_presentasi', ''))
-    link_rekaman = clean_string(data.get('link_rekaman', ''))
+def available_cpus() -> int:
+    """Jumlah CPU yang boleh dipakai (menghormati limit cgroup container)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 (docker compose deploy.resources.limits.cpus)
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+PHOTO_MAX_SIZE = (800, 600)  # Max resolution untuk PDF
+PHOTO_JPEG_QUALITY = 85
+# Versi pemrosesan foto - naikkan setiap kali hasil _prepare_photo berubah
+# (resampling, format, dsb.), supaya turunan lama di cache foto tidak dipakai
+PHOTO_VERSION = 1
+PHOTO_WORKERS = int(os.getenv('LAPORAN_PHOTO_WORKERS', '0')) or available_cpus()
+
+# Batas memori decode foto. JPEG di-decode dengan draft mode (skala 1/2..1/8
+# langsung dari DCT), jadi foto 48 MP hanya butuh ~3 MP saat decode; format
+# lain di-decode penuh sehingga batasnya lebih kecil. Piksel yang sedang
+# di-decode bersamaan (semua worker foto) dibatasi MAX_DECODE_PIXELS, jadi
+# peak RSS aplikasi dosen tetap di bawah PHOTO_RSS_CEILING_MB berapa pun
+# jumlah worker (dicek oleh benchmarks/bench_pdf.py). Dockerfile juga membatasi
+# arena malloc (MALLOC_ARENA_MAX), supaya buffer decode yang sudah dibebaskan
+# tidak tertahan di arena tiap thread worker.
+MAX_JPEG_PIXELS = int(os.getenv('LAPORAN_MAX_JPEG_MP', '64')) * 1_000_000
+MAX_OTHER_PIXELS = int(os.getenv('LAPORAN_MAX_OTHER_MP', '24')) * 1_000_000
+MAX_TOTAL_PIXELS = int(os.getenv('LAPORAN_MAX_TOTAL_MP', '400')) * 1_000_000
+MAX_DECODE_PIXELS = int(os.getenv('LAPORAN_MAX_DECODE_MP', '24')) * 1_000_000
+PHOTO_RSS_CEILING_MB = 384
+
+
+class PhotoTooLarge(ValueError):
+    """Foto melebihi batas piksel"""
+
+
+def _open_source(photo):
+    """Path, bytes, atau file-like -> sesuatu yang bisa dibaca PIL/fpdf"""
+    if isinstance(photo, (bytes, bytearray, memoryview)):
+        return BytesIO(photo)
+    return photo
+
+
+def _check_pixels(img):
+    limit = MAX_JPEG_PIXELS if img.format == 'JPEG' else MAX_OTHER_PIXELS
+    if img.width * img.height > limit:
+        raise PhotoTooLarge(
+            f"Foto {img.width}x{img.height} terlalu besar (maks {limit // 1_000_000} MP untuk {img.format})"
+        )
+
+
+def photo_pixels(photo) -> int:
+    """Jumlah piksel foto dari header saja (tanpa decode). Raise PhotoTooLarge jika melebihi batas."""
+    from PIL import Image
+
+    photo = _open_source(photo)
+    try:
+        with Image.open(photo) as img:
+            _check_pixels(img)
+            return img.width * img.height
+    finally:
+        if hasattr(photo, 'seek'):
+            photo.seek(0)
+
+
+class PixelBudget:
+    """Semaphore berbobot jumlah piksel: decode foto menunggu sampai total
+    piksel yang sedang di-decode (lintas thread) muat dalam kapasitas.
+    Foto yang lebih besar dari kapasitas tetap jalan, tapi sendirian."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, pixels: int):
+        pixels = min(pixels, self.capacity)
+        with self._cond:
+            self._cond.wait_for(lambda: self.in_use + pixels <= self.capacity)
+            self.in_use += pixels
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_use -= pixels
+                self._cond.notify_all()
+
+
+_decode_budget = PixelBudget(MAX_DECODE_PIXELS)
+
+
+def _prepare_photo(photo, max_size=PHOTO_MAX_SIZE):
+    """Decode + resize + encode JPEG satu foto. Return path/buffer siap untuk pdf.image"""
+    from PIL import Image
+
+    photo = _open_source(photo)
+    with Image.open(photo) as img:
+        _check_pixels(img)
+        if img.width <= max_size[0] and img.height <= max_size[1]:
+            if hasattr(photo, 'seek'):
+                photo.seek(0)
+            return photo
+        if img.format == 'JPEG':
+            # Decode langsung pada skala terkecil yang masih >= max_size
+            img.draft('RGB', max_size)
+        # img.size sudah ukuran decode (setelah draft)
+        with _decode_budget.reserve(img.width * img.height):
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            img.convert('RGB').save(buffer, 'JPEG', quality=PHOTO_JPEG_QUALITY)
+    buffer.seek(0)
+    return buffer
+
+
+# Cache foto siap-PDF (hasil _prepare_photo), 0 = tanpa cache
+PHOTO_CACHE_MB = int(os.getenv('LAPORAN_PHOTO_CACHE_MB', '64'))
+
+_photo_cache = None
+
+
+def get_photo_cache():
+    """Cache turunan foto per (isi foto, setting pemrosesan), dibuat saat pertama dipakai.
+    None jika dimatikan (LAPORAN_PHOTO_CACHE_MB=0)."""
+    global _photo_cache
+    if _photo_cache is None and PHOTO_CACHE_MB > 0:
+        from cache import CACHE_DIR, DiskLRUCache
+        _photo_cache = DiskLRUCache(CACHE_DIR / 'foto', PHOTO_CACHE_MB * 1024 * 1024, suffix='.img')
+    return _photo_cache
+
+
+def photo_cache_key(photo, max_size=PHOTO_MAX_SIZE) -> str:
+    """Key cache foto: isi foto + semua setting yang memengaruhi hasil _prepare_photo"""
+    from cache import stable_hash
+    return stable_hash('foto', PHOTO_VERSION, list(max_size), PHOTO_JPEG_QUALITY,
+                       MAX_JPEG_PIXELS, MAX_OTHER_PIXELS, _photo_bytes(photo))
+
+
+def preprocess_photos(photo_paths: List, max_size=PHOTO_MAX_SIZE,
+                      workers: int = None, progress=None) -> List:
+    """Siapkan semua foto secara paralel (thread pool terbatas).
+
+    Foto boleh berupa path, bytes, atau file-like (mis. UploadedFile).
+    Urutan hasil sama dengan urutan input; foto yang gagal diproses
+    menjadi None supaya penomoran foto tetap. progress(photos=n) dipanggil
+    setiap satu foto selesai. Foto yang sudah pernah diproses dengan
+    setting yang sama diambil dari cache (tanpa decode/resize sama sekali);
+    batas piksel tetap dicek dari header.
+    """
+    done = [0]
+    done_lock = threading.Lock()
+    cache = get_photo_cache()
+
+    def finished():
+        if progress:
+            with done_lock:
+                done[0] += 1
+                progress(photos=done[0])
+
+    def prepare(i):
+        try:
+            if photo_paths[i] is None:
+                return None
+            with span('pdf.photo_prepare'):
+                prepared = _prepare_photo(photo_paths[i], max_size)
+            if keys[i]:
+                cache.put(keys[i], _photo_bytes(prepared))
+            return prepared
+        except Exception as e:
+            print(f"Error processing photo: {e}")
+            return None
+        finally:
+            finished()
+
+    if not photo_paths:
+        return []
+
+    photo_paths = list(photo_paths)
+    results = [None] * len(photo_paths)
+    keys = [None] * len(photo_paths)
+    pending = []
+    total = 0
+    for i, photo in enumerate(photo_paths):
+        if photo is None:
+            pending.append(i)
+            continue
+        # Tolak lebih awal (dari header) foto yang melebihi batas / total budget
+        # piksel - juga untuk foto yang ada di cache, supaya batas baru berlaku
+        try:
+            total += photo_pixels(photo)
+            if total > MAX_TOTAL_PIXELS:
+                raise PhotoTooLarge(f"Total piksel foto melebihi {MAX_TOTAL_PIXELS // 1_000_000} MP")
+        except Exception as e:
+            print(f"Error processing photo {i + 1}: {e}")
+            photo_paths[i] = None
+            pending.append(i)
+            continue
+        if cache is not None:
+            try:
+                keys[i] = photo_cache_key(photo, max_size)
+            except Exception as e:
+                print(f"Error reading photo {i + 1}: {e}")
+            cached = cache.get(keys[i]) if keys[i] else None
+            if cached is not None:
+                results[i] = BytesIO(cached)
+                finished()
+                continue
+        pending.append(i)
+
+    workers = max(1, min(workers or PHOTO_WORKERS, len(pending) or 1))
+    if workers == 1:
+        prepared = [prepare(i) for i in pending]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='photo') as pool:
+            prepared = list(pool.map(prepare, pending))
+    for i, photo in zip(pending, prepared):
+        results[i] = photo
+    return results
+
+
+SIGNATURE_PADDING = 6  # px di sekitar coretan setelah di-trim
+
+
+def encode_signature(image_data):
+    """Array RGBA dari canvas -> PNG grayscale yang di-trim ke area coretan.
+
+    Return None jika canvas kosong.
+    """
+    from PIL import Image, ImageOps
+
+    img = Image.fromarray(image_data.astype('uint8')).convert('RGBA')
+    background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+    background.alpha_composite(img)
+    gray = background.convert('L')
+
+    bbox = ImageOps.invert(gray).getbbox()
+    if bbox is None:
+        return None
+    left, top, right, bottom = bbox
+    gray = gray.crop((
+        max(0, left - SIGNATURE_PADDING),
+        max(0, top - SIGNATURE_PADDING),
+        min(gray.width, right + SIGNATURE_PADDING),
+        min(gray.height, bottom + SIGNATURE_PADDING),
+    ))
+
+    buffer = BytesIO()
+    gray.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def load_signature(data: Dict):
+    """Bytes gambar tanda tangan: dari blob (signature_ref) atau base64 lama (signature)"""
+    if data.get('signature_ref'):
+        from storage import get_blob
+        return get_blob(data['signature_ref'])
+    signature = data.get('signature')
+    if isinstance(signature, str):
+        import base64
+        return base64.b64decode(signature)
+    return signature or None
+
+
+# Adjusted widths - total 160mm (safe for A4: 210mm - 40mm margin)
+TABLE_WIDTHS = [8, 60, 40, 25, 27]
+TABLE_HEADERS = ['No', 'Nama', 'NPM', 'Hadir', 'T.Hadir']
+TABLE_ROW_HEIGHT = 6
+TABLE_FONT_SIZE = 8
+TABLE_MIN_FONT_SIZE = 6
+CELL_PADDING = 2  # fpdf c_margin kiri + kanan (mm)
+
+
+def _fit_text(pdf, text: str, width: float, min_size: float = TABLE_MIN_FONT_SIZE):
+    """Muat teks ke lebar kolom berdasarkan lebar glyph (bukan jumlah karakter).
+
+    Coba kecilkan font sampai min_size; jika masih terlalu lebar, potong
+    dengan '...' (binary search). Return (teks, ukuran_font).
+    """
+    size = pdf.font_size_pt
+    text_width = pdf.get_string_width(text)
+    if text_width <= width:
+        return text, size
+
+    # Lebar teks sebanding dengan ukuran font
+    fit_size = size * width / text_width
+    if fit_size >= min_size:
+        return text, max(min_size, int(fit_size * 2) / 2)
+
+    pdf.set_font_size(min_size)
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if pdf.get_string_width(text[:mid] + '...') <= width:
+            lo = mid
+        else:
+            hi = mid - 1
+    pdf.set_font_size(size)
+    return text[:lo].rstrip() + '...', min_size
+
+
+def _table_header(pdf, widths, headers):
+    pdf.set_font(FONT, 'B', 9)
+    pdf.set_fill_color(200, 200, 200)
+    for width, header in zip(widths, headers):
+        pdf.cell(width, 7, header, 1, 0, 'C', True)
+    pdf.ln()
+    pdf.set_font(FONT, '', TABLE_FONT_SIZE)
+
+
+def render_kehadiran_table(pdf, mahasiswa: List, widths=TABLE_WIDTHS, headers=TABLE_HEADERS,
+                           row_height: float = TABLE_ROW_HEIGHT):
+    """Tabel kehadiran untuk daftar besar (kuliah gabungan ribuan peserta).
+
+    Teks dan ukuran font tiap baris dihitung sekali di awal, header
+    diulang di setiap halaman baru. Baris boleh Mahasiswa atau dict.
+    """
+    # Pass 1: teks kolom + ukuran font hasil shrink-fit
+    pdf.set_font(FONT, '', TABLE_FONT_SIZE)
+    nama_width = widths[1] - CELL_PADDING
+    npm_width = widths[2] - CELL_PADDING
+    rows = []
+    for idx, mhs in enumerate(mahasiswa, 1):
+        nama, npm, hadir = as_mahasiswa(mhs).pdf_fields()
+        nama, nama_size = _fit_text(pdf, nama, nama_width)
+        npm, npm_size = _fit_text(pdf, npm, npm_width)
+        rows.append((str(idx), nama, nama_size, npm, npm_size, 'V' if hadir else '', '' if hadir else 'V'))
+
+    # Pass 2: render, header diulang saat pindah halaman
+    auto_page_break = pdf.auto_page_break
+    pdf.set_auto_page_break(False, margin=pdf.b_margin)
+    try:
+        _table_header(pdf, widths, headers)
+        for no, nama, nama_size, npm, npm_size, mark_hadir, mark_tidak in rows:
+            if pdf.get_y() + row_height > pdf.page_break_trigger:
+                pdf.add_page()
+                _table_header(pdf, widths, headers)
+
+            pdf.cell(widths[0], row_height, no, 1, 0, 'C')
+            if nama_size != TABLE_FONT_SIZE:
+                pdf.set_font_size(nama_size)
+            pdf.cell(widths[1], row_height, nama, 1, 0, 'L')
+            if npm_size != nama_size:
+                pdf.set_font_size(npm_size)
+            pdf.cell(widths[2], row_height, npm, 1, 0, 'C')
+            if npm_size != TABLE_FONT_SIZE:
+                pdf.set_font_size(TABLE_FONT_SIZE)
+            pdf.cell(widths[3], row_height, mark_hadir, 1, 0, 'C')
+            pdf.cell(widths[4], row_height, mark_tidak, 1, 1, 'C')
+    finally:
+        pdf.set_auto_page_break(auto_page_break, margin=pdf.b_margin)
+
+
+@timed('pdf.generate')
+def generate_simple_pdf(data: Union[Dict, Laporan], photo_paths: List = None,
+                        in_memory: bool = False, progress=None) -> Union[str, bytes]:
+    """Generate PDF - simple and reliable
+
+    data boleh dict atau Laporan (teks yang sudah dibersihkan dipakai ulang).
+    photo_paths boleh berisi path, bytes, atau file-like. Dengan
+    in_memory=True hasilnya langsung bytes PDF (tanpa file sementara);
+    default tetap path file PDF sementara. progress (opsional) dipanggil
+    dengan photos=n / pages=n selama render. Durasi tiap fase dicatat
+    sebagai span pdf.<fase> (lihat metrics).
+    """
+    phases = Phases('pdf')
+    if progress:
+        progress(photos=0, photos_total=len(photo_paths or []), pages=0)
+    
+    # Clean ALL data first (sekali per Laporan)
+    laporan = data if isinstance(data, Laporan) else Laporan.from_dict(data)
+    text = laporan.pdf_text()
+    matkul = text['matkul']
+    sks = text['sks']
+    dosen = text['dosen']
+    prodi = text['prodi']
+    jam = text['jam']
+    tanggal = text['tanggal']
+    
+    mahasiswa = laporan.mahasiswa
+    catatan = text['catatan']
+    
+    ttd_tempat = text['ttd_tempat']
+    ttd_tanggal = text['ttd_tanggal']
+    ttd_nama = text['ttd_nama']
+    
+    link_presentasi = text['link_presentasi']
+    link_rekaman = text['link_rekaman']
     
     # Create PDF
-    pdf = LaporanPDF()
+    pdf = _laporan_pdf_class()()
+    pdf.progress = progress
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.alias_nb_pages()
     pdf.add_page()
+    phases.mark('setup')
     
     # IDENTITAS
-    pdf.set_font('Arial', 'B', 12)
+    pdf.set_font(FONT, 'B', 12)
     pdf.cell(0, 10, 'IDENTITAS', 0, 1, 'L')
     pdf.ln(2)
     
-    pdf.set_font('Arial', '', 11)
+    pdf.set_font(FONT, '', 11)
     col1 = 50
     
     items = [
@@ -82,68 +600,32 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
     
     for label, value in items:
         if value:
-            pdf.set_font('Arial', 'B', 11)
+            pdf.set_font(FONT, 'B', 11)
             pdf.cell(col1, 8, label + ' :', 0, 0)
-            pdf.set_font('Arial', '', 11)
+            pdf.set_font(FONT, '', 11)
             pdf.cell(0, 8, value, 0, 1)
     
     pdf.ln(5)
     
     # KEHADIRAN
-    pdf.set_font('Arial', 'B', 12)
+    pdf.set_font(FONT, 'B', 12)
     pdf.cell(0, 10, 'KEHADIRAN MAHASISWA', 0, 1, 'L')
     pdf.ln(2)
     
-    # Table header
-    pdf.set_font('Arial', 'B', 9)
-    pdf.set_fill_color(200, 200, 200)
-    
-    # Adjusted widths - total 160mm (safe for A4: 210mm - 40mm margin)
-    widths = [8, 60, 40, 25, 27]
-    headers = ['No', 'Nama', 'NPM', 'Hadir', 'T.Hadir']
-    
-    for i, header in enumerate(headers):
-        pdf.cell(widths[i], 7, header, 1, 0, 'C', True)
-    pdf.ln()
-    
-    # Table body - simple approach
-    pdf.set_font('Arial', '', 8)
-    for idx, mhs in enumerate(mahasiswa, 1):
-        nama = clean_string(mhs.get('nama', ''))
-        npm = clean_string(mhs.get('npm', ''))[:12]  # NPM max 12 char
-        status = clean_string(mhs.get('status', ''))
-        
-        # Truncate nama if too long, add ... 
-        max_chars = 32
-        if len(nama) > max_chars:
-            nama = nama[:max_chars-3] + '...'
-        
-        # Fixed row height
-        row_height = 6
-        
-        pdf.cell(widths[0], row_height, str(idx), 1, 0, 'C')
-        pdf.cell(widths[1], row_height, nama, 1, 0, 'L')
-        pdf.cell(widths[2], row_height, npm, 1, 0, 'C')
-        
-        # Hadir checkbox
-        if 'hadir' in status.lower():
-            pdf.cell(widths[3], row_height, 'V', 1, 0, 'C')
-            pdf.cell(widths[4], row_height, '', 1, 1, 'C')
-        else:
-            pdf.cell(widths[3], row_height, '', 1, 0, 'C')
-            pdf.cell(widths[4], row_height, 'V', 1, 1, 'C')
+    phases.mark('identitas')
+    render_kehadiran_table(pdf, mahasiswa)
+    phases.mark('table')
     
     pdf.ln(5)
     
     # CATATAN
     if catatan:
-        pdf.set_font('Arial', 'B', 12)
+        pdf.set_font(FONT, 'B', 12)
         pdf.cell(0, 10, 'CATATAN', 0, 1, 'L')
         pdf.ln(2)
         
-        pdf.set_font('Arial', '', 10)
-        for i, note in enumerate(catatan, 1):
-            clean_note = clean_string(note)
+        pdf.set_font(FONT, '', 10)
+        for i, clean_note in enumerate(catatan, 1):
             # Use effective page width (page width - left/right margins)
             effective_width = pdf.w - pdf.l_margin - pdf.r_margin
             # Ensure we start at left margin for each line
@@ -153,11 +635,11 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
         pdf.ln(3)
     
     # CATATAN STANDARD
-    pdf.set_font('Arial', 'B', 12)
+    pdf.set_font(FONT, 'B', 12)
     pdf.cell(0, 10, 'Catatan:', 0, 1, 'L')
     pdf.ln(2)
     
-    pdf.set_font('Arial', '', 9)
+    pdf.set_font(FONT, '', 9)
     
     # Link akan di-wrap jika terlalu panjang (tidak dipotong)
     link_pres = link_presentasi if link_presentasi else '-'
@@ -186,7 +668,7 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
     
     # TTD DOSEN (sebelum dokumentasi)
     if ttd_tempat or ttd_tanggal:
-        pdf.set_font('Arial', '', 10)
+        pdf.set_font(FONT, '', 10)
         ttd_text = ''
         if ttd_tempat:
             ttd_text += ttd_tempat
@@ -200,25 +682,17 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
     pdf.cell(0, 8, 'Dosen Pengampu', 0, 1, 'R')
     
     # Add signature image if exists
-    if data.get('signature'):
+    signature = load_signature({'signature_ref': laporan.signature_ref, 'signature': laporan.signature})
+    if signature:
         try:
-            import base64
-            import io
             from PIL import Image
             
-            # Decode signature
-            img_data = base64.b64decode(data['signature'])
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Save temp
-            temp_sig = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            img.save(temp_sig.name, 'PNG')
-            
-            # Add to PDF
-            pdf.image(temp_sig.name, x=150, y=pdf.get_y(), w=40, h=15)
-            
-            # Cleanup
-            os.unlink(temp_sig.name)
+            # Muat dalam kotak 40x15 mm, rata kanan, rasio aspek dipertahankan
+            with Image.open(BytesIO(signature)) as img:
+                width, height = img.size
+            w = min(40, 15 * width / height)
+            h = w * height / width
+            pdf.image(BytesIO(signature), x=190 - w, y=pdf.get_y() + (15 - h), w=w, h=h)
             
             pdf.ln(15)
         except Exception as e:
@@ -232,33 +706,25 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
     
     # Nama dosen dan NIDN - gunakan default jika kosong
     nama_dosen_ttd = ttd_nama if ttd_nama else dosen if dosen else 'Dra. Asmawati M.Pd'
-    pdf.set_font('Arial', 'B', 11)
+    pdf.set_font(FONT, 'B', 11)
     pdf.cell(0, 8, nama_dosen_ttd, 0, 1, 'R')
-    pdf.set_font('Arial', '', 10)
+    pdf.set_font(FONT, '', 10)
     pdf.cell(0, 6, 'NIDN. 0021066303', 0, 1, 'R')
+    phases.mark('catatan_ttd')
     
     # DOKUMENTASI / FOTO - 4 foto per halaman (PALING AKHIR)
     if photo_paths:
-        from PIL import Image
+        photos = preprocess_photos(photo_paths, progress=progress)
+        phases.mark('photos')
         
         pdf.add_page()
-        pdf.set_font('Arial', 'B', 14)
+        pdf.set_font(FONT, 'B', 14)
         pdf.cell(0, 10, 'DOKUMENTASI PERKULIAHAN', 0, 1, 'C')
         pdf.ln(8)
         
         # Layout: 2 kolom x 2 baris = 4 foto per halaman
-        for i, photo_path in enumerate(photo_paths, 1):
+        for i, photo in enumerate(photos, 1):
             try:
-                # Optimize: Resize large images untuk mempercepat PDF generation
-                img = Image.open(photo_path)
-                max_size = (800, 600)  # Max resolution untuk PDF
-                if img.width > max_size[0] or img.height > max_size[1]:
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                    # Save optimized image
-                    temp_optimized = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-                    img.convert('RGB').save(temp_optimized.name, 'JPEG', quality=85)
-                    photo_path = temp_optimized.name
-                
                 # Calculate position (2x2 grid)
                 col = (i - 1) % 2  # 0 atau 1
                 row = ((i - 1) // 2) % 2  # 0 atau 1
@@ -266,7 +732,7 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
                 # New page every 4 photos
                 if i > 1 and (i - 1) % 4 == 0:
                     pdf.add_page()
-                    pdf.set_font('Arial', 'B', 14)
+                    pdf.set_font(FONT, 'B', 14)
                     pdf.cell(0, 10, 'DOKUMENTASI PERKULIAHAN', 0, 1, 'C')
                     pdf.ln(8)
                     row = 0
@@ -275,16 +741,26 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
                 x_pos = 15 if col == 0 else 110
                 y_pos = 45 + (row * 120)
                 
+                if photo is None:
+                    # Foto gagal diproses - slot dibiarkan kosong
+                    continue
+                
                 # Add photo
-                pdf.image(photo_path, x=x_pos, y=y_pos, w=85, h=60)
+                pdf.image(photo, x=x_pos, y=y_pos, w=85, h=60)
                 
                 # Caption below photo
                 pdf.set_xy(x_pos, y_pos + 62)
-                pdf.set_font('Arial', 'I', 8)
+                pdf.set_font(FONT, 'I', 8)
                 pdf.cell(85, 4, f'Foto {i}', 0, 0, 'C')
                 
             except Exception as e:
                 print(f"Error adding photo {i}: {e}")
+        phases.mark('photo_layout')
+    
+    if in_memory:
+        pdf_data = bytes(pdf.output())
+        phases.mark('output')
+        return pdf_data
     
     # Save
     temp_file = tempfile.NamedTemporaryFile(
@@ -294,19 +770,119 @@ def generate_simple_pdf(data: Dict, photo_paths: List[str] = None) -> str:
     )
     
     pdf.output(temp_file.name)
+    phases.mark('output')
     
     return temp_file.name
 
 
+REKAP_WIDTHS = [8, 62, 34, 16, 16, 16, 16, 22]
+REKAP_HEADERS = ['No', 'Nama', 'NPM', 'Hadir', 'Izin', 'Sakit', 'Alpa', '%']
+
+
+@timed('pdf.rekap')
+def generate_rekap_pdf(rekap: Dict) -> bytes:
+    """PDF rekap kehadiran satu semester (hasil Archive.recap)"""
+    pdf = _laporan_pdf_class()()
+    pdf.judul = 'REKAP KEHADIRAN MAHASISWA'
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font(FONT, '', 11)
+    for label, value in [('Nama Mata Kuliah', rekap['matkul']), ('Semester', rekap['semester']),
+                         ('Jumlah Pertemuan', str(rekap['pertemuan']))]:
+        pdf.set_font(FONT, 'B', 11)
+        pdf.cell(50, 8, label + ' :', 0, 0)
+        pdf.set_font(FONT, '', 11)
+        pdf.cell(0, 8, clean_string(value), 0, 1)
+    pdf.ln(5)
+
+    widths, row_height = REKAP_WIDTHS, TABLE_ROW_HEIGHT
+    pdf.set_font(FONT, '', TABLE_FONT_SIZE)
+    auto_page_break = pdf.auto_page_break
+    pdf.set_auto_page_break(False, margin=pdf.b_margin)
+    try:
+        _table_header(pdf, widths, REKAP_HEADERS)
+        for idx, row in enumerate(rekap['mahasiswa'], 1):
+            if pdf.get_y() + row_height > pdf.page_break_trigger:
+                pdf.add_page()
+                _table_header(pdf, widths, REKAP_HEADERS)
+            nama, nama_size = _fit_text(pdf, clean_string(row['nama']), widths[1] - CELL_PADDING)
+            pdf.cell(widths[0], row_height, str(idx), 1, 0, 'C')
+            pdf.set_font_size(nama_size)
+            pdf.cell(widths[1], row_height, nama, 1, 0, 'L')
+            pdf.set_font_size(TABLE_FONT_SIZE)
+            pdf.cell(widths[2], row_height, clean_string(row['npm']), 1, 0, 'C')
+            for i, key in enumerate(['hadir', 'izin', 'sakit', 'alpa'], 3):
+                pdf.cell(widths[i], row_height, str(row[key]), 1, 0, 'C')
+            pdf.cell(widths[7], row_height, f"{row['persen']:.1f}", 1, 1, 'C')
+    finally:
+        pdf.set_auto_page_break(auto_page_break, margin=pdf.b_margin)
+    return bytes(pdf.output())
+
+
+# Versi tampilan PDF - naikkan setiap kali layout/renderer/font berubah, supaya
+# PDF lama di cache (direktori cache bertahan antar deploy) tidak dipakai lagi
+RENDER_VERSION = 2
+
+PDF_CACHE_MB = int(os.getenv('LAPORAN_PDF_CACHE_MB', '100'))
+
+_pdf_cache = None
+
+
+def get_pdf_cache():
+    """Cache PDF hasil render (dibuat saat pertama dipakai)"""
+    global _pdf_cache
+    if _pdf_cache is None:
+        from cache import CACHE_DIR, DiskLRUCache
+        _pdf_cache = DiskLRUCache(CACHE_DIR / 'pdf', PDF_CACHE_MB * 1024 * 1024, suffix='.pdf')
+    return _pdf_cache
+
+
+def _photo_bytes(photo):
+    if isinstance(photo, (bytes, bytearray, memoryview)):
+        return photo
+    if hasattr(photo, 'getbuffer'):
+        # Tanpa copy (mis. UploadedFile / BytesIO)
+        return photo.getbuffer()
+    if hasattr(photo, 'read'):
+        data = photo.read()
+        photo.seek(0)
+        return data
+    with open(photo, 'rb') as f:
+        return f.read()
+
+
+def report_cache_key(data: Union[Dict, Laporan], photos: List = None) -> str:
+    """Hash stabil dari semua yang mempengaruhi isi PDF.
+
+    Field yang tidak ikut dirender (waktu_absen, keterangan, dll) tidak
+    masuk ke key, jadi perubahan di situ tidak memaksa render ulang.
+    """
+    from cache import stable_hash
+
+    laporan = data if isinstance(data, Laporan) else Laporan.from_dict(data)
+    normalized = dict(laporan.pdf_text())
+    normalized['mahasiswa'] = [list(mhs.pdf_fields()) for mhs in laporan.mahasiswa]
+    # signature_ref sudah berupa content hash
+    signature = laporan.signature_ref or laporan.signature or ''
+    return stable_hash(RENDER_VERSION, FONT, normalized, signature,
+                       *[_photo_bytes(photo) for photo in (photos or [])])
+
+
+def generate_pdf_cached(data: Union[Dict, Laporan], photos: List = None, progress=None) -> bytes:
+    """Seperti generate_simple_pdf(in_memory=True), tapi hasil identik diambil dari cache"""
+    cache = get_pdf_cache()
+    # Satu Laporan untuk key + render: teks cukup dibersihkan sekali
+    data = data if isinstance(data, Laporan) else Laporan.from_dict(data)
+    key = report_cache_key(data, photos)
+    pdf_data = cache.get(key)
+    if pdf_data is None:
+        with profile('pdf'):
+            pdf_data = generate_simple_pdf(data, photos, in_memory=True, progress=progress)
+        cache.put(key, pdf_data)
+    return pdf_data
+
+
 def validate_laporan_data(data: Dict) -> tuple:
-    """Validate data"""
-    if not data.get('matkul'):
-        return False, "Mata kuliah harus diisi"
-    
-    if not data.get('dosen'):
-        return False, "Nama dosen harus diisi"
-    
-    if not data.get('mahasiswa'):
-        return False, "Data mahasiswa harus diisi"
-    
-    return True, "OK"
+    """Validate data (lihat Laporan.validate)"""
+    return Laporan.from_dict(data).validate()